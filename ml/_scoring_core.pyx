@@ -0,0 +1,53 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+⚡ Compiled consistency kernels for ml.comprehensive_scoring
+Optional: build in place with ``cythonize -i ml/_scoring_core.pyx``; without it the
+numba / pure-Python kernels in comprehensive_scoring are used instead.
+"""
+
+from libc.math cimport sqrt
+
+import numpy as np
+
+cdef long long DAY_US = 86400LL * 1000000LL
+cdef double SCORE_CAP = 100.0
+
+
+cdef double _consistency(const long long[:] ts, Py_ssize_t start, Py_ssize_t stop) noexcept nogil:
+    """📅 Welford mean/std of day gaps over ts[start:stop] (already sorted)"""
+    cdef Py_ssize_t n = stop - start
+    cdef Py_ssize_t i
+    cdef double mean = 0.0, m2 = 0.0, gap, delta, stdev, score
+    if n < 2:
+        return 50.0
+    for i in range(1, n):
+        gap = <double>((ts[start + i] - ts[start + i - 1]) // DAY_US)
+        delta = gap - mean
+        mean += delta / i
+        m2 += delta * (gap - mean)
+    if mean == 0:
+        return 100.0
+    if n < 3:
+        return 50.0  # Sample std dev needs at least two gaps
+    stdev = sqrt(m2 / (n - 2))
+    score = 100.0 / (stdev / mean + 1.0)
+    return score if score < SCORE_CAP else SCORE_CAP
+
+
+def consistency_score(const long long[:] sorted_epoch_us):
+    """📅 Consistency score for one learner's sorted epoch-microsecond timestamps"""
+    return _consistency(sorted_epoch_us, 0, sorted_epoch_us.shape[0])
+
+
+def batch_consistency_scores(const long long[:] sorted_epoch_us, const long long[:] offsets,
+                             const long long[:] activity_counts):
+    """📦 Consistency per learner; timestamps grouped by learner via ``offsets`` (length n + 1)"""
+    cdef Py_ssize_t n_learners = activity_counts.shape[0]
+    cdef Py_ssize_t owner
+    result = np.full(n_learners, 50.0)
+    cdef double[:] out = result
+    with nogil:
+        for owner in range(n_learners):
+            if activity_counts[owner] >= 3:
+                out[owner] = _consistency(sorted_epoch_us, offsets[owner], offsets[owner + 1])
+    return result
@@ -5,10 +5,251 @@ Calculates advanced learner scores based on test and quiz marks with course reco
 """
 
 import json
-import statistics
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional, Tuple
 import math
+import re
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from utils.result_cache import ResultCache
+
+# 🔢 Optional NumPy for batch scoring (falls back to per-learner scoring)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# ⚡ Optional JIT for the numeric kernels (falls back to plain Python)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# 🏎️ Optional Cython build of the consistency kernels (cythonize -i ml/_scoring_core.pyx)
+try:
+    from ml._scoring_core import consistency_score as _compiled_consistency_score
+    from ml._scoring_core import batch_consistency_scores as _compiled_batch_consistency_scores
+    CYTHON_CORE_AVAILABLE = NUMPY_AVAILABLE
+except ImportError:
+    CYTHON_CORE_AVAILABLE = False
+
+# 🔢 Small integer codes for activity types (other types are numbered per scoring call)
+ACTIVITY_TYPE_ID = {
+    'test_completed': 0,
+    'exam_taken': 1,
+    'assessment_completed': 2,
+    'quiz_completed': 3,
+    'quiz_taken': 4,
+    'quick_assessment': 5,
+}
+TEST_MASK = (1 << 0) | (1 << 1) | (1 << 2)
+QUIZ_MASK = (1 << 3) | (1 << 4) | (1 << 5)
+
+
+def _activity_type_bit(activity_type: Optional[str], other_ids: Optional[Dict[Any, int]] = None) -> int:
+    """🔢 Single-bit mask for an activity type
+    Types outside ACTIVITY_TYPE_ID are numbered in ``other_ids``, a dict owned by one scoring call
+    (so user-supplied types never accumulate in module state); without it they map to 0 (no bit)
+    """
+    code = ACTIVITY_TYPE_ID.get(activity_type)
+    if code is None:
+        if other_ids is None:
+            return 0
+        code = other_ids.setdefault(activity_type, len(ACTIVITY_TYPE_ID) + len(other_ids))
+    return 1 << code
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_DAY_US = 86400 * 1000000
+# 🔥 Engagement scoring constants (caps, points and combine weights)
+_SCORE_CAP = 100.0
+_FREQUENCY_POINTS = 10.0   # 10 points per recent activity
+_POINTS_PER_HOUR = 5.0     # 5 points per hour of activity
+_DIVERSITY_POINTS = 15.0   # 15 points per activity type
+_FREQUENCY_WEIGHT = 0.3
+_DURATION_WEIGHT = 0.3
+_DIVERSITY_WEIGHT = 0.2
+_CONSISTENCY_WEIGHT = 0.2
+
+_NUMPY_SORT_MIN = 16  # Below this, NumPy dispatch costs more than it saves
+
+# 🧠 Score memoization (entries expire with the time bucket so the 30-day window stays fresh)
+_SCORE_CACHE_SIZE = 4096
+_SCORE_CACHE_BUCKET_SECONDS = 300
+_FINGERPRINT_FIELDS = ('activity_type', 'score', 'difficulty', 'duration', 'timestamp')
+_MISSING = object()  # Distinguishes absent fields from explicit None in fingerprints
+
+
+# 🕒 ISO-8601 fast path: validated up front so bad timestamps never raise
+_TIMESTAMP_RE = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d{1,6}))?(Z|[+-]\d{2}:\d{2})?$'
+)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    """🕒 Parse an activity timestamp, returning None when it is missing or malformed"""
+    if isinstance(value, datetime):
+        return value
+    if not value or not isinstance(value, str):
+        return None
+    
+    match = _TIMESTAMP_RE.match(value)
+    if match is None:
+        # Rare ISO variants (date-only, compact offsets) go through the stdlib parser
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    tzinfo = None
+    if offset == 'Z':
+        tzinfo = timezone.utc
+    elif offset:
+        sign = -1 if offset[0] == '-' else 1
+        tzinfo = timezone(sign * timedelta(hours=int(offset[1:3]), minutes=int(offset[4:6])))
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                        int(fraction.ljust(6, '0')) if fraction else 0, tzinfo)
+    except ValueError:
+        return None  # Out-of-range field such as month 13
+
+
+def _epoch_us(timestamp: datetime) -> int:
+    """⏱️ Microseconds since the Unix epoch (naive timestamps are treated as UTC)"""
+    delta = timestamp - (_EPOCH if timestamp.tzinfo is None else _EPOCH_UTC)
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+@njit(cache=True)
+def _consistency_kernel(sorted_epoch_us) -> float:
+    """📅 Consistency score from sorted epoch-microsecond timestamps (single Welford pass over day gaps)"""
+    n = len(sorted_epoch_us)
+    if n < 2:
+        return 50.0
+    
+    mean = 0.0
+    m2 = 0.0
+    for i in range(1, n):
+        gap = (sorted_epoch_us[i] - sorted_epoch_us[i - 1]) // _DAY_US
+        delta = gap - mean
+        mean += delta / i
+        m2 += delta * (gap - mean)
+    
+    if mean == 0:
+        return 100.0
+    if n < 3:
+        return 50.0  # Sample std dev needs at least two gaps
+    
+    stdev = math.sqrt(m2 / (n - 2))
+    return min(100.0 / (stdev / mean + 1.0), _SCORE_CAP)
+
+
+@njit(cache=True)
+def _engagement_kernel(recent_count: int, total_duration: float,
+                       type_count: int, consistency_score: float) -> float:
+    """🔥 Weighted combination of the engagement components"""
+    activity_frequency_score = min(recent_count * _FREQUENCY_POINTS, _SCORE_CAP)
+    duration_score = min(total_duration / 60.0 * _POINTS_PER_HOUR, _SCORE_CAP)
+    diversity_score = min(type_count * _DIVERSITY_POINTS, _SCORE_CAP)
+    engagement_score = (
+        activity_frequency_score * _FREQUENCY_WEIGHT +
+        duration_score * _DURATION_WEIGHT +
+        diversity_score * _DIVERSITY_WEIGHT +
+        consistency_score * _CONSISTENCY_WEIGHT
+    )
+    return min(engagement_score, _SCORE_CAP)
+
+
+# 📚 Course catalog with performance-based filtering (shared, treat as read-only)
+_COURSE_CATALOG = {
+    'poor': (
+        {'id': 'foundations-101', 'title': '🎯 Learning Foundations', 'difficulty': 'beginner', 'emoji': '🎯'},
+        {'id': 'basics-review', 'title': '📝 Concept Review Basics', 'difficulty': 'beginner', 'emoji': '📝'},
+        {'id': 'study-skills', 'title': '📖 Study Skills Workshop', 'difficulty': 'beginner', 'emoji': '📖'}
+    ),
+    'needs_improvement': (
+        {'id': 'core-concepts', 'title': '💡 Core Concepts Mastery', 'difficulty': 'beginner', 'emoji': '💡'},
+        {'id': 'practice-track', 'title': '🏃 Practice Track', 'difficulty': 'beginner', 'emoji': '🏃'},
+        {'id': 'skill-building', 'title': '🔨 Skill Building Basics', 'difficulty': 'intermediate', 'emoji': '🔨'}
+    ),
+    'satisfactory': (
+        {'id': 'intermediate-track', 'title': '📈 Intermediate Learning Path', 'difficulty': 'intermediate', 'emoji': '📈'},
+        {'id': 'project-basics', 'title': '🛠️ Project Basics', 'difficulty': 'intermediate', 'emoji': '🛠️'},
+        {'id': 'applied-learning', 'title': '🎯 Applied Learning', 'difficulty': 'intermediate', 'emoji': '🎯'}
+    ),
+    'good': (
+        {'id': 'advanced-concepts', 'title': '🚀 Advanced Concepts', 'difficulty': 'intermediate', 'emoji': '🚀'},
+        {'id': 'specialization-track', 'title': '🎓 Specialization Track', 'difficulty': 'advanced', 'emoji': '🎓'},
+        {'id': 'leadership-skills', 'title': '👑 Leadership Skills', 'difficulty': 'advanced', 'emoji': '👑'}
+    ),
+    'very_good': (
+        {'id': 'expert-level', 'title': '🌟 Expert Level Challenge', 'difficulty': 'advanced', 'emoji': '🌟'},
+        {'id': 'mastery-track', 'title': '👑 Mastery Track', 'difficulty': 'expert', 'emoji': '👑'},
+        {'id': 'innovation-projects', 'title': '💡 Innovation Projects', 'difficulty': 'expert', 'emoji': '💡'}
+    ),
+    'excellent': (
+        {'id': 'expert-mastery', 'title': '🏆 Expert Mastery Program', 'difficulty': 'expert', 'emoji': '🏆'},
+        {'id': 'mentorship-track', 'title': '🎯 Mentorship Program', 'difficulty': 'expert', 'emoji': '🎯'},
+        {'id': 'research-projects', 'title': '🔬 Research Projects', 'difficulty': 'expert', 'emoji': '🔬'}
+    )
+}
+
+# 🛤️ Learning paths per performance level (shared, treat as read-only)
+_LEARNING_PATHS = {
+    'poor': (
+        "📚 Start with foundational courses",
+        "📝 Complete basic assessments", 
+        "💪 Focus on daily practice",
+        "🤝 Seek additional support",
+        "📈 Track progress regularly"
+    ),
+    'needs_improvement': (
+        "🔍 Review weak areas",
+        "📖 Study core concepts thoroughly",
+        "🎯 Practice with guided exercises",
+        "📊 Monitor improvement",
+        "🌟 Celebrate small wins"
+    ),
+    'satisfactory': (
+        "💡 Strengthen understanding",
+        "🛠️ Apply concepts practically", 
+        "📈 Challenge with intermediate content",
+        "🤝 Join study groups",
+        "🎯 Set intermediate goals"
+    ),
+    'good': (
+        "🚀 Explore advanced topics",
+        "🎓 Specialize in areas of interest",
+        "🔨 Work on complex projects",
+        "👥 Teach or mentor others",
+        "🏆 Aim for mastery"
+    ),
+    'very_good': (
+        "🌟 Tackle expert-level challenges",
+        "💡 Innovate and create",
+        "🎯 Lead learning initiatives", 
+        "🔬 Conduct research",
+        "👑 Become a subject expert"
+    ),
+    'excellent': (
+        "🏆 Push boundaries of knowledge",
+        "🎯 Mentor high performers",
+        "🔬 Lead research initiatives",
+        "💡 Innovate new methodologies",
+        "🌟 Inspire learning excellence"
+    )
+}
+
 
 class ComprehensiveScoringSystem:
     """🎯 Advanced scoring system for comprehensive learner assessment"""
@@ -48,68 +289,270 @@ class ComprehensiveScoringSystem:
             'advanced': 1.5,
             'expert': 1.8
         }
+        
+        # 🧠 LRU cache of computed scores keyed by learner fingerprint
+        self._score_cache = ResultCache(_SCORE_CACHE_SIZE, learner_of=lambda key: key[1])
+        
+        # 💡 Insight lookup tables: ascending thresholds and one message per band (low → high)
+        self._insight_tables = (
+            # 📝 Test performance
+            ((70, 85), (
+                "⚠️ Test scores suggest need for concept review",
+                "✅ Good test performance with room for improvement",
+                "🎯 Excellent test performance - strong grasp of concepts",
+            )),
+            # ❓ Quiz performance
+            ((65, 80), (
+                "💪 Quiz scores indicate need for more practice",
+                "📈 Steady quiz performance",
+                "🧠 Strong quiz performance - quick recall and understanding",
+            )),
+            # 🔥 Engagement
+            ((60, 80), (
+                "📈 Consider increasing learning activity frequency",
+                "👍 Good engagement level",
+                "🚀 Highly engaged learner with consistent activity",
+            )),
+            # 📊 Overall performance
+            ((70, 85), (
+                "🎯 Focus on consistent practice and improvement",
+                "⭐ Solid performance across all areas",
+                "🌟 Outstanding overall performance!",
+            )),
+        )
+    
+    def calculate_learner_score(self, learner_data: Dict[str, Any],
+                                now_iso: Optional[str] = None) -> Dict[str, Any]:
+        """🎯 Calculate comprehensive learner score based on test and quiz marks (memoized)
+        
+        ``now_iso`` lets a caller scoring many learners stamp them all with one
+        precomputed timestamp instead of formatting the clock per learner.
+        """
+        now_iso = now_iso or datetime.utcnow().isoformat()
+        try:
+            cache_key = self._score_cache_key(learner_data)
+            hash(cache_key)
+        except (TypeError, AttributeError):
+            cache_key = None  # Unhashable activity data, score without caching
+        
+        if cache_key is not None:
+            cached = self._score_cache.get(cache_key)
+            if cached is not None:
+                cached['timestamp'] = now_iso
+                return cached
+        
+        result = self._compute_learner_score(learner_data, now_iso)
+        
+        if cache_key is not None and 'error' not in result:
+            self._score_cache.put(cache_key, result)
+        return result
+    
+    def clear_cache(self) -> None:
+        """🧹 Drop all memoized learner scores"""
+        self._score_cache.clear()
+    
+    def _score_cache_key(self, learner_data: Dict[str, Any]) -> Tuple:
+        """🔑 Full fingerprint of everything the score depends on"""
+        learner_id = learner_data.get('id') or learner_data.get('_id')
+        fingerprint = tuple(
+            tuple(activity.get(field, _MISSING) for field in _FINGERPRINT_FIELDS)
+            for activity in learner_data.get('activities', [])
+        )
+        time_bucket = int(time.time() // _SCORE_CACHE_BUCKET_SECONDS)
+        return (time_bucket, learner_id, fingerprint)
     
-    def calculate_learner_score(self, learner_data: Dict[str, Any]) -> Dict[str, Any]:
-        """🎯 Calculate comprehensive learner score based on test and quiz marks"""
+    def _compute_learner_score(self, learner_data: Dict[str, Any], now_iso: str) -> Dict[str, Any]:
+        """🎯 Uncached score computation"""
         try:
             learner_id = learner_data.get('id') or learner_data.get('_id')
             activities = learner_data.get('activities', [])
             
             if not activities:
-                return self._get_new_learner_score()
+                return self._get_new_learner_score(now_iso)
             
             # 📊 Calculate component scores
             test_score = self._calculate_test_average(activities)
             quiz_score = self._calculate_quiz_average(activities)
             engagement_score = self._calculate_engagement_consistency(activities, learner_data)
             
-            # 🧮 Calculate weighted final score
-            overall_score = (
-                test_score * self.weight_config['test_score'] +
-                quiz_score * self.weight_config['quiz_score']
-            )
-            
-            # 🎯 Apply engagement bonus
-            engagement_bonus = min(engagement_score / 100 * self.weight_config['engagement_bonus'] * 100, 5)
-            overall_score += engagement_bonus
-            
-            # 🎨 Determine performance level with emojis
-            performance_level = self._get_performance_level(overall_score)
-            performance_emoji = self.emoji_scores.get(performance_level, '📊')
-            
-            # 💡 Generate insights and recommendations
-            insights = self._generate_score_insights(test_score, quiz_score, engagement_score, overall_score)
-            recommendations = self._generate_score_based_recommendations(overall_score, performance_level)
-            
-            # 🎯 Course recommendations based on performance
-            course_recommendations = self._get_course_recommendations_by_performance(performance_level)
-            
-            return {
-                'learner_id': learner_id,
-                'overall_score': round(overall_score, 2),
-                'performance_level': performance_level,
-                'performance_emoji': performance_emoji,
-                'component_scores': {
-                    'test_average': round(test_score, 2),
-                    'quiz_average': round(quiz_score, 2),
-                    'engagement_score': round(engagement_score, 2),
-                    'engagement_bonus': round(engagement_bonus, 2)
-                },
-                'weighting_used': self.weight_config,
-                'insights': insights,
-                'recommendations': recommendations,
-                'course_recommendations': course_recommendations,
-                'learning_path': self._suggest_learning_path(performance_level),
-                'timestamp': datetime.utcnow().isoformat()
-            }
+            return self._assemble_score(learner_id, test_score, quiz_score, engagement_score, now_iso)
             
         except Exception as e:
             return {'error': f'🎯 Scoring calculation failed: {str(e)}'}
     
+    def score_many(self, learners: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """📦 Score a batch of learners with NumPy reductions over all their activities at once"""
+        now = datetime.utcnow()
+        now_iso = now.isoformat()
+        if not NUMPY_AVAILABLE:
+            return [self.calculate_learner_score(learner_data, now_iso) for learner_data in learners]
+        
+        try:
+            components = self._batch_component_scores(learners, now)
+        except (TypeError, ValueError, AttributeError):
+            # Malformed activity data: score individually so each learner gets its own error
+            return [self.calculate_learner_score(learner_data, now_iso) for learner_data in learners]
+        
+        results = []
+        for learner_data, component in zip(learners, components):
+            if component is None:
+                results.append(self._get_new_learner_score(now_iso))
+            else:
+                learner_id = learner_data.get('id') or learner_data.get('_id')
+                results.append(self._assemble_score(learner_id, *component, now_iso))
+        return results
+    
+    def _batch_component_scores(self, learners: List[Dict[str, Any]],
+                                now: datetime) -> List[Optional[Tuple[float, float, float]]]:
+        """🔢 (test, quiz, engagement) per learner from one flattened SoA block; None for new learners"""
+        owners, type_codes, scores, multipliers, durations, epoch_us = [], [], [], [], [], []
+        activity_counts = []
+        other_type_ids = {}
+        for owner, learner_data in enumerate(learners):
+            activities = learner_data.get('activities', [])
+            activity_counts.append(len(activities))
+            for activity in activities:
+                type_bit = _activity_type_bit(activity.get('activity_type'), other_type_ids)
+                score = 0.0
+                multiplier = 1.0
+                if type_bit & (TEST_MASK | QUIZ_MASK):
+                    score = activity.get('score', 0)
+                    if not isinstance(score, (int, float)):
+                        raise TypeError(f'non-numeric score: {score!r}')
+                    if type_bit & TEST_MASK:
+                        multiplier = self.difficulty_multipliers.get(activity.get('difficulty', 'intermediate'), 1.0)
+                duration = activity.get('duration')
+                if duration and not isinstance(duration, (int, float)):
+                    raise TypeError(f'non-numeric duration: {duration!r}')
+                timestamp = _parse_timestamp(activity.get('timestamp'))
+                
+                owners.append(owner)
+                type_codes.append(type_bit.bit_length() - 1)
+                scores.append(score)
+                multipliers.append(multiplier)
+                durations.append(duration or 0)
+                epoch_us.append(_epoch_us(timestamp) if timestamp is not None else -1)
+        
+        n_learners = len(learners)
+        owner_ix = np.asarray(owners, dtype=np.int64)
+        codes = np.asarray(type_codes, dtype=np.int64)
+        score_arr = np.asarray(scores, dtype=np.float64)
+        ts_arr = np.asarray(epoch_us, dtype=np.int64)
+        # Only the fixed ACTIVITY_TYPE_ID codes carry test/quiz bits (other codes may exceed 63)
+        known_type = codes < len(ACTIVITY_TYPE_ID)
+        type_bits = np.where(known_type, np.left_shift(1, np.where(known_type, codes, 0)), 0)
+        is_test = (type_bits & TEST_MASK) != 0
+        is_quiz = (type_bits & QUIZ_MASK) != 0
+        
+        # 📝 Tests: recency-weighted mean of difficulty-adjusted scores
+        adjusted = np.minimum(score_arr * np.asarray(multipliers, dtype=np.float64), 100.0)
+        test_counts = np.bincount(owner_ix[is_test], minlength=n_learners)
+        test_position = np.zeros(len(owners), dtype=np.int64)
+        if is_test.any():
+            test_owner = owner_ix[is_test]
+            first_test = np.concatenate(([0], np.cumsum(test_counts)[:-1]))
+            test_position[is_test] = np.arange(test_owner.size) - first_test[test_owner]
+        weights = np.where(is_test, 0.3 + 0.2 * (test_counts[owner_ix] - 1 - test_position), 0.0)
+        weight_sums = np.bincount(owner_ix, weights=weights, minlength=n_learners)
+        weighted_scores = np.bincount(owner_ix, weights=weights * adjusted, minlength=n_learners)
+        test_avg = np.divide(weighted_scores, weight_sums, out=np.full(n_learners, 75.0), where=test_counts > 0)
+        
+        # ❓ Quizzes: plain mean
+        quiz_counts = np.bincount(owner_ix[is_quiz], minlength=n_learners)
+        quiz_sums = np.bincount(owner_ix[is_quiz], weights=score_arr[is_quiz], minlength=n_learners)
+        quiz_avg = np.divide(quiz_sums, quiz_counts, out=np.full(n_learners, 75.0), where=quiz_counts > 0)
+        
+        # 🔥 Engagement components
+        total_duration = np.bincount(owner_ix, weights=np.asarray(durations, dtype=np.float64), minlength=n_learners)
+        n_type_codes = len(ACTIVITY_TYPE_ID) + len(other_type_ids)
+        distinct_pairs = np.unique(owner_ix * n_type_codes + codes)
+        type_counts = np.bincount(distinct_pairs // n_type_codes, minlength=n_learners)
+        cutoff_us = _epoch_us(now - timedelta(days=30))
+        recent_counts = np.bincount(owner_ix[ts_arr >= cutoff_us], minlength=n_learners)
+        
+        # 📅 Consistency: sort valid timestamps by (learner, time) once, then one kernel call per learner
+        valid = ts_arr >= 0
+        valid_owner = owner_ix[valid]
+        valid_ts = ts_arr[valid]
+        order = np.lexsort((valid_ts, valid_owner))
+        sorted_ts = np.ascontiguousarray(valid_ts[order])
+        valid_counts = np.bincount(valid_owner, minlength=n_learners)
+        valid_offsets = np.concatenate(([0], np.cumsum(valid_counts)))
+        
+        if CYTHON_CORE_AVAILABLE:
+            consistency = _compiled_batch_consistency_scores(
+                sorted_ts, valid_offsets.astype(np.int64), np.asarray(activity_counts, dtype=np.int64)
+            )
+        else:
+            consistency = np.full(n_learners, 50.0)
+            for owner in range(n_learners):
+                if activity_counts[owner] >= 3:
+                    learner_ts = sorted_ts[valid_offsets[owner]:valid_offsets[owner + 1]]
+                    consistency[owner] = _consistency_kernel(learner_ts if NUMBA_AVAILABLE else learner_ts.tolist())
+        
+        # 🔥 Engagement combine for the whole batch: one clip over the component matrix
+        engagement_components = np.minimum(np.column_stack((
+            recent_counts * _FREQUENCY_POINTS,
+            total_duration / 60.0 * _POINTS_PER_HOUR,
+            type_counts * _DIVERSITY_POINTS,
+            consistency,
+        )), _SCORE_CAP)
+        engagement_weights = np.array((_FREQUENCY_WEIGHT, _DURATION_WEIGHT, _DIVERSITY_WEIGHT, _CONSISTENCY_WEIGHT))
+        engagement = np.minimum(engagement_components @ engagement_weights, _SCORE_CAP)
+        
+        return [
+            (float(test_avg[owner]), float(quiz_avg[owner]), float(engagement[owner]))
+            if activity_counts[owner] else None
+            for owner in range(n_learners)
+        ]
+    
+    def _assemble_score(self, learner_id: Any, test_score: float, quiz_score: float,
+                        engagement_score: float, now_iso: str) -> Dict[str, Any]:
+        """🧮 Build the score result from the three component scores"""
+        # 🧮 Calculate weighted final score
+        overall_score = (
+            test_score * self.weight_config['test_score'] +
+            quiz_score * self.weight_config['quiz_score']
+        )
+        
+        # 🎯 Apply engagement bonus
+        engagement_bonus = min(engagement_score / 100 * self.weight_config['engagement_bonus'] * 100, 5)
+        overall_score += engagement_bonus
+        
+        # 🎨 Determine performance level with emojis
+        performance_level = self._get_performance_level(overall_score)
+        performance_emoji = self.emoji_scores.get(performance_level, '📊')
+        
+        # 💡 Generate insights and recommendations
+        insights = self._generate_score_insights(test_score, quiz_score, engagement_score, overall_score)
+        recommendations = self._generate_score_based_recommendations(overall_score, performance_level)
+        
+        # 🎯 Course recommendations based on performance
+        course_recommendations = self._get_course_recommendations_by_performance(performance_level)
+        
+        return {
+            'learner_id': learner_id,
+            'overall_score': round(overall_score, 2),
+            'performance_level': performance_level,
+            'performance_emoji': performance_emoji,
+            'component_scores': {
+                'test_average': round(test_score, 2),
+                'quiz_average': round(quiz_score, 2),
+                'engagement_score': round(engagement_score, 2),
+                'engagement_bonus': round(engagement_bonus, 2)
+            },
+            'weighting_used': self.weight_config,
+            'insights': insights,
+            'recommendations': recommendations,
+            'course_recommendations': course_recommendations,
+            'learning_path': self._suggest_learning_path(performance_level),
+            'timestamp': now_iso
+        }
+    
     def _calculate_test_average(self, activities: List[Dict]) -> float:
         """📝 Calculate weighted test score average"""
         test_activities = [a for a in activities 
-                          if a.get('activity_type') in ['test_completed', 'exam_taken', 'assessment_completed']]
+                          if _activity_type_bit(a.get('activity_type')) & TEST_MASK]
         
         if not test_activities:
             return 75.0  # Default neutral score
@@ -136,13 +579,13 @@ class ComprehensiveScoringSystem:
     def _calculate_quiz_average(self, activities: List[Dict]) -> float:
         """❓ Calculate quiz score average"""
         quiz_activities = [a for a in activities 
-                          if a.get('activity_type') in ['quiz_completed', 'quiz_taken', 'quick_assessment']]
+                          if _activity_type_bit(a.get('activity_type')) & QUIZ_MASK]
         
         if not quiz_activities:
             return 75.0  # Default neutral score
         
         quiz_scores = [activity.get('score', 0) for activity in quiz_activities]
-        return statistics.mean(quiz_scores) if quiz_scores else 75.0
+        return sum(quiz_scores) / len(quiz_scores) if quiz_scores else 75.0
     
     def _calculate_engagement_consistency(self, activities: List[Dict], learner_data: Dict) -> float:
         """🔥 Calculate engagement and consistency score"""
@@ -151,75 +594,63 @@ class ComprehensiveScoringSystem:
         
         # 📅 Recent activity frequency
         recent_activities = self._get_recent_activities(activities, days=30)
-        activity_frequency_score = min(len(recent_activities) * 10, 100)
-        
-        # ⏱️ Duration engagement
-        total_duration = sum([a.get('duration', 0) for a in activities if a.get('duration')])
-        duration_score = min(total_duration / 60 * 5, 100)  # 5 points per hour
         
-        # 🎯 Activity diversity
-        activity_types = set([a.get('activity_type') for a in activities])
-        diversity_score = min(len(activity_types) * 15, 100)  # 15 points per activity type
+        # ⏱️ Duration engagement and 🎯 activity diversity (one bit per distinct type) in one pass
+        total_duration = 0
+        type_mask = 0
+        other_type_ids = {}
+        for activity in activities:
+            duration = activity.get('duration')
+            if duration:
+                total_duration += duration
+            type_mask |= _activity_type_bit(activity.get('activity_type'), other_type_ids)
         
         # 📈 Consistency calculation
         consistency_score = self._calculate_consistency_score(activities)
         
         # Combine scores
-        engagement_score = (
-            activity_frequency_score * 0.3 + 
-            duration_score * 0.3 + 
-            diversity_score * 0.2 + 
-            consistency_score * 0.2
-        )
-        
-        return min(engagement_score, 100.0)
+        return _engagement_kernel(len(recent_activities), float(total_duration),
+                                  type_mask.bit_count(), consistency_score)
     
     def _calculate_consistency_score(self, activities: List[Dict]) -> float:
         """📅 Calculate learning consistency score"""
         if len(activities) < 3:
             return 50.0  # Neutral for new learners
         
-        # Get timestamps and sort
-        timestamps = []
+        # Collect timestamps as epoch microseconds (integer gaps, no timedelta objects)
+        epoch_us = []
         for activity in activities:
-            try:
-                timestamp = datetime.fromisoformat(activity.get('timestamp', '').replace('Z', '+00:00'))
-                timestamps.append(timestamp)
-            except:
-                continue
+            timestamp = _parse_timestamp(activity.get('timestamp'))
+            if timestamp is not None:
+                epoch_us.append(_epoch_us(timestamp))
         
-        if len(timestamps) < 2:
+        if len(epoch_us) < 2:
             return 50.0
         
-        # Calculate time gaps
-        timestamps.sort()
-        gaps = [(timestamps[i] - timestamps[i-1]).days for i in range(1, len(timestamps))]
-        
-        if not gaps:
-            return 50.0
-        
-        # Consistency factor (lower std dev = higher consistency)
-        avg_gap = statistics.mean(gaps)
-        if avg_gap == 0:
-            return 100.0
-        
-        consistency_factor = 1 / (statistics.stdev(gaps) / avg_gap + 1)
-        consistency_score = min(consistency_factor * 100, 100)
+        # Sort once: C-level int64 sort for larger logs, plain list sort for small ones
+        if CYTHON_CORE_AVAILABLE or NUMBA_AVAILABLE:
+            small_log = len(epoch_us) < _NUMPY_SORT_MIN
+            if small_log:
+                epoch_us.sort()
+            epoch_us = np.asarray(epoch_us, dtype=np.int64)
+            if not small_log:
+                epoch_us.sort()
+        else:
+            epoch_us.sort()
         
-        return consistency_score
+        if CYTHON_CORE_AVAILABLE:
+            return _compiled_consistency_score(epoch_us)
+        return float(_consistency_kernel(epoch_us))
     
     def _get_recent_activities(self, activities: List[Dict], days: int = 30) -> List[Dict]:
         """📅 Get activities from the last N days"""
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        cutoff_us = _epoch_us(datetime.utcnow() - timedelta(days=days))
         recent_activities = []
         
         for activity in activities:
-            try:
-                timestamp = datetime.fromisoformat(activity.get('timestamp', '').replace('Z', '+00:00'))
-                if timestamp >= cutoff_date:
-                    recent_activities.append(activity)
-            except:
-                continue
+            timestamp = _parse_timestamp(activity.get('timestamp'))
+            if timestamp is not None and _epoch_us(timestamp) >= cutoff_us:
+                recent_activities.append(activity)
         
         return recent_activities
     
@@ -234,41 +665,12 @@ class ComprehensiveScoringSystem:
     def _generate_score_insights(self, test_score: float, quiz_score: float, 
                                engagement_score: float, overall_score: float) -> List[str]:
         """💡 Generate personalized insights"""
-        insights = []
-        
-        # 📝 Test performance insights
-        if test_score >= 85:
-            insights.append("🎯 Excellent test performance - strong grasp of concepts")
-        elif test_score >= 70:
-            insights.append("✅ Good test performance with room for improvement")
-        else:
-            insights.append("⚠️ Test scores suggest need for concept review")
-        
-        # ❓ Quiz performance insights
-        if quiz_score >= 80:
-            insights.append("🧠 Strong quiz performance - quick recall and understanding")
-        elif quiz_score >= 65:
-            insights.append("📈 Steady quiz performance")
-        else:
-            insights.append("💪 Quiz scores indicate need for more practice")
-        
-        # 🔥 Engagement insights
-        if engagement_score >= 80:
-            insights.append("🚀 Highly engaged learner with consistent activity")
-        elif engagement_score >= 60:
-            insights.append("👍 Good engagement level")
-        else:
-            insights.append("📈 Consider increasing learning activity frequency")
-        
-        # 📊 Overall performance
-        if overall_score >= 85:
-            insights.append("🌟 Outstanding overall performance!")
-        elif overall_score >= 70:
-            insights.append("⭐ Solid performance across all areas")
-        else:
-            insights.append("🎯 Focus on consistent practice and improvement")
-        
-        return insights
+        return [
+            messages[bisect_right(thresholds, score)]
+            for score, (thresholds, messages) in zip(
+                (test_score, quiz_score, engagement_score, overall_score), self._insight_tables
+            )
+        ]
     
     def _generate_score_based_recommendations(self, overall_score: float, performance_level: str) -> List[Dict]:
         """🎯 Generate performance-based recommendations"""
@@ -313,95 +715,19 @@ class ComprehensiveScoringSystem:
         
         return recommendations
     
-    def _get_course_recommendations_by_performance(self, performance_level: str) -> List[Dict]:
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _get_course_recommendations_by_performance(performance_level: str) -> Tuple[Dict, ...]:
         """📚 Get course recommendations based on performance level"""
-        
-        # 📚 Course catalog with performance-based filtering
-        course_catalog = {
-            'poor': [
-                {'id': 'foundations-101', 'title': '🎯 Learning Foundations', 'difficulty': 'beginner', 'emoji': '🎯'},
-                {'id': 'basics-review', 'title': '📝 Concept Review Basics', 'difficulty': 'beginner', 'emoji': '📝'},
-                {'id': 'study-skills', 'title': '📖 Study Skills Workshop', 'difficulty': 'beginner', 'emoji': '📖'}
-            ],
-            'needs_improvement': [
-                {'id': 'core-concepts', 'title': '💡 Core Concepts Mastery', 'difficulty': 'beginner', 'emoji': '💡'},
-                {'id': 'practice-track', 'title': '🏃 Practice Track', 'difficulty': 'beginner', 'emoji': '🏃'},
-                {'id': 'skill-building', 'title': '🔨 Skill Building Basics', 'difficulty': 'intermediate', 'emoji': '🔨'}
-            ],
-            'satisfactory': [
-                {'id': 'intermediate-track', 'title': '📈 Intermediate Learning Path', 'difficulty': 'intermediate', 'emoji': '📈'},
-                {'id': 'project-basics', 'title': '🛠️ Project Basics', 'difficulty': 'intermediate', 'emoji': '🛠️'},
-                {'id': 'applied-learning', 'title': '🎯 Applied Learning', 'difficulty': 'intermediate', 'emoji': '🎯'}
-            ],
-            'good': [
-                {'id': 'advanced-concepts', 'title': '🚀 Advanced Concepts', 'difficulty': 'intermediate', 'emoji': '🚀'},
-                {'id': 'specialization-track', 'title': '🎓 Specialization Track', 'difficulty': 'advanced', 'emoji': '🎓'},
-                {'id': 'leadership-skills', 'title': '👑 Leadership Skills', 'difficulty': 'advanced', 'emoji': '👑'}
-            ],
-            'very_good': [
-                {'id': 'expert-level', 'title': '🌟 Expert Level Challenge', 'difficulty': 'advanced', 'emoji': '🌟'},
-                {'id': 'mastery-track', 'title': '👑 Mastery Track', 'difficulty': 'expert', 'emoji': '👑'},
-                {'id': 'innovation-projects', 'title': '💡 Innovation Projects', 'difficulty': 'expert', 'emoji': '💡'}
-            ],
-            'excellent': [
-                {'id': 'expert-mastery', 'title': '🏆 Expert Mastery Program', 'difficulty': 'expert', 'emoji': '🏆'},
-                {'id': 'mentorship-track', 'title': '🎯 Mentorship Program', 'difficulty': 'expert', 'emoji': '🎯'},
-                {'id': 'research-projects', 'title': '🔬 Research Projects', 'difficulty': 'expert', 'emoji': '🔬'}
-            ]
-        }
-        
-        return course_catalog.get(performance_level, course_catalog['satisfactory'])
+        return _COURSE_CATALOG.get(performance_level, _COURSE_CATALOG['satisfactory'])
     
-    def _suggest_learning_path(self, performance_level: str) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _suggest_learning_path(performance_level: str) -> Tuple[str, ...]:
         """🛤️ Suggest personalized learning path"""
-        paths = {
-            'poor': [
-                "📚 Start with foundational courses",
-                "📝 Complete basic assessments", 
-                "💪 Focus on daily practice",
-                "🤝 Seek additional support",
-                "📈 Track progress regularly"
-            ],
-            'needs_improvement': [
-                "🔍 Review weak areas",
-                "📖 Study core concepts thoroughly",
-                "🎯 Practice with guided exercises",
-                "📊 Monitor improvement",
-                "🌟 Celebrate small wins"
-            ],
-            'satisfactory': [
-                "💡 Strengthen understanding",
-                "🛠️ Apply concepts practically", 
-                "📈 Challenge with intermediate content",
-                "🤝 Join study groups",
-                "🎯 Set intermediate goals"
-            ],
-            'good': [
-                "🚀 Explore advanced topics",
-                "🎓 Specialize in areas of interest",
-                "🔨 Work on complex projects",
-                "👥 Teach or mentor others",
-                "🏆 Aim for mastery"
-            ],
-            'very_good': [
-                "🌟 Tackle expert-level challenges",
-                "💡 Innovate and create",
-                "🎯 Lead learning initiatives", 
-                "🔬 Conduct research",
-                "👑 Become a subject expert"
-            ],
-            'excellent': [
-                "🏆 Push boundaries of knowledge",
-                "🎯 Mentor high performers",
-                "🔬 Lead research initiatives",
-                "💡 Innovate new methodologies",
-                "🌟 Inspire learning excellence"
-            ]
-        }
-        
-        return paths.get(performance_level, paths['satisfactory'])
+        return _LEARNING_PATHS.get(performance_level, _LEARNING_PATHS['satisfactory'])
     
-    def _get_new_learner_score(self) -> Dict[str, Any]:
+    def _get_new_learner_score(self, now_iso: Optional[str] = None) -> Dict[str, Any]:
         """🆕 Default score for new learners"""
         return {
             'learner_id': None,
@@ -440,7 +766,7 @@ class ComprehensiveScoringSystem:
                 "📚 Start with beginner courses",
                 "📈 Track your progress"
             ],
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso or datetime.utcnow().isoformat()
         }
 
 # 🌍 Global scoring system instance
@@ -4,13 +4,133 @@ Matches content difficulty to learner ability and provides personalized recommen
 """
 
 import numpy as np
+import pandas as pd
+import heapq
+import math
+import re
+from collections import namedtuple
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from utils.crud_operations import read_learner, read_contents, read_engagements
 
+# Optional JIT for the recommendation score combination (falls back to plain Python)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Distinct content field values whose difficulty/domain extraction is memoized
+CONTENT_FEATURE_CACHE_SIZE = 8192
+
+# Catalogs at least this large are matched with NumPy instead of per-item Python
+VECTORIZED_MATCH_MIN_CONTENT = 32
+
+# Activity logs shorter than this are summarized with scalar math (pandas setup dominates)
+PANDAS_DOMAIN_MIN_ACTIVITIES = 64
+
+# Content must score above this to be recommended
+RECOMMENDATION_MIN_SCORE = 0.3
+
+# Completion time (minutes) assumed for content whose metadata lacks a usable one
+DEFAULT_COMPLETION_TIME = 60
+
+# Lowercased content fields, derived once per item and shared by the recommendation scorers
+_ContentView = namedtuple(
+    "_ContentView", "content title_l desc_l type_l course_l tags_l combined_l difficulty"
+)
+
+
+def _compile_domain_regex(domain_map: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> re.Pattern:
+    """Compile ordered (domain, keywords) pairs into one regex whose lastgroup is the first matching domain.
+    
+    Each domain is a lookahead alternative tried in mapping order at position 0, so the
+    result matches the original "first domain with any keyword in the text" priority
+    rather than the leftmost keyword occurrence.
+    """
+    alternatives = [
+        f"(?=.*?(?:{'|'.join(re.escape(keyword) for keyword in keywords)}))(?P<{domain}>)"
+        for domain, keywords in domain_map
+    ]
+    return re.compile("|".join(alternatives), re.DOTALL)
+
+
+def _estimated_completion_time(content: Dict) -> float:
+    """Content's estimated completion time in minutes (DEFAULT_COMPLETION_TIME when missing or malformed)"""
+    metadata = content.get("metadata")
+    if not isinstance(metadata, dict):
+        return DEFAULT_COMPLETION_TIME
+    try:
+        estimated_time = float(metadata.get("estimated_completion_time", DEFAULT_COMPLETION_TIME))
+    except (TypeError, ValueError):
+        return DEFAULT_COMPLETION_TIME
+    return estimated_time if not math.isnan(estimated_time) else DEFAULT_COMPLETION_TIME
+
+
+@njit(cache=True, parallel=True)
+def _combine_scores(difficulty, style, interest, progression, engagement, weights):
+    """Weighted recommendation totals for whole arrays of sub-scores (rows split across cores)"""
+    totals = np.empty(difficulty.shape[0])
+    for i in prange(difficulty.shape[0]):
+        totals[i] = (difficulty[i] * weights[0] + style[i] * weights[1] + interest[i] * weights[2] +
+                     progression[i] * weights[3] + engagement[i] * weights[4])
+    return totals
+
+
 class DifficultyMatchingAlgorithm:
     """Algorithm to match content difficulty to learner ability"""
     
+    # Activity-type keywords per domain, checked in priority order
+    _ACTIVITY_DOMAIN_MAP = (
+        ("programming", ("python", "code", "programming", "algorithm")),
+        ("data_science", ("data", "analytics", "statistics", "machine_learning")),
+        ("web_development", ("web", "html", "css", "javascript")),
+        ("mathematics", ("math", "algebra", "calculus")),
+        ("language", ("english", "writing", "communication")),
+        ("design", ("design", "ux", "ui", "graphics"))
+    )
+    
+    # Course/title/content-type keywords per domain, checked in priority order
+    _CONTENT_DOMAIN_MAP = (
+        ("programming", ("python", "code", "programming", "software")),
+        ("data_science", ("data", "analytics", "statistics", "machine_learning", "ai")),
+        ("web_development", ("web", "html", "css", "javascript", "frontend", "react")),
+        ("mathematics", ("math", "algebra", "calculus", "statistics")),
+        ("language", ("english", "writing", "communication", "language")),
+        ("design", ("design", "ux", "ui", "graphics", "visual"))
+    )
+    
+    # Single-pass domain classifiers, compiled once and shared by every instance
+    _ACTIVITY_DOMAIN_REGEX = _compile_domain_regex(_ACTIVITY_DOMAIN_MAP)
+    _CONTENT_DOMAIN_REGEX = _compile_domain_regex(_CONTENT_DOMAIN_MAP)
+    
+    # Per-domain alternations for the vectorized (pandas str.contains) classifier
+    _ACTIVITY_DOMAIN_PATTERNS = tuple(
+        (domain, "|".join(re.escape(keyword) for keyword in keywords))
+        for domain, keywords in _ACTIVITY_DOMAIN_MAP
+    )
+    
+    # Difficulty labels to numeric levels
+    _DIFFICULTY_TEXT_LEVELS = {
+        "beginner": 2,
+        "novice": 3,
+        "elementary": 4,
+        "intermediate": 5,
+        "upper intermediate": 6,
+        "advanced": 7,
+        "expert": 8,
+        "master": 9,
+        "professional": 10
+    }
+    
     def __init__(self):
         self.difficulty_levels = {
             1: {"name": "Beginner", "description": "Basic concepts, no prior knowledge required"},
@@ -33,6 +153,18 @@ class DifficultyMatchingAlgorithm:
             "machine_learning": {"beginner": 6, "intermediate": 8, "advanced": 10},
             "language": {"beginner": 2, "intermediate": 4, "advanced": 7}
         }
+        
+        # Content difficulty/domain memoized on the raw field values, so repeated
+        # extraction for the same item (and in-place content updates) stay correct
+        self._difficulty_from_text = lru_cache(maxsize=CONTENT_FEATURE_CACHE_SIZE)(self._difficulty_from_text)
+        self._domain_from_text = lru_cache(maxsize=CONTENT_FEATURE_CACHE_SIZE)(self._domain_from_text)
+        
+        # Bucket lookups (ascending thresholds, one entry per band from low to high);
+        # np.searchsorted works on a single value or a whole array of them
+        self._score_thresholds = np.array([60, 70, 80, 90])
+        self._score_levels = (("beginner", 2), ("novice", 3), ("intermediate", 5), ("advanced", 7), ("expert", 9))
+        self._numeric_thresholds = np.array([3, 5, 7, 9])
+        self._numeric_levels = ("beginner", "novice", "intermediate", "advanced", "expert")
     
     def assess_learner_ability(self, learner_id: str) -> Dict[str, any]:
         """Assess learner's current ability level across different domains"""
@@ -45,8 +177,12 @@ class DifficultyMatchingAlgorithm:
             if not activities:
                 return self._get_default_ability_assessment(learner_id)
             
+            # Long logs are converted to columns once and shared by the analysis steps
+            activity_frame = (self._build_activity_frame(activities)
+                              if len(activities) >= PANDAS_DOMAIN_MIN_ACTIVITIES else None)
+            
             # Analyze performance by domain
-            domain_performance = self._analyze_domain_performance(activities)
+            domain_performance = self._analyze_domain_performance(activities, activity_frame)
             
             # Calculate ability levels
             ability_assessment = {}
@@ -62,53 +198,42 @@ class DifficultyMatchingAlgorithm:
                 "domain_abilities": ability_assessment,
                 "overall_ability": overall_ability,
                 "assessment_timestamp": datetime.now().isoformat(),
-                "confidence_score": self._calculate_assessment_confidence(activities)
+                "confidence_score": self._calculate_assessment_confidence(activities, activity_frame)
             }
             
         except Exception as e:
             return {"error": f"Ability assessment failed: {str(e)}"}
     
-    def match_content_difficulty(self, learner_id: str, content_list: List[Dict]) -> List[Dict]:
-        """Match content difficulty to learner ability"""
+    def match_content_difficulty(self, learner_id: str, content_list: List[Dict],
+                                 assessment: Optional[Dict] = None, top_k: Optional[int] = None) -> List[Dict]:
+        """Match content difficulty to learner ability
+        
+        Pass ``assessment`` when the caller already holds this learner's ability
+        assessment; otherwise it is computed once for the whole list. With
+        ``top_k`` only the best ``top_k`` matches are returned.
+        """
         try:
-            ability_assessment = self.assess_learner_ability(learner_id)
+            ability_assessment = assessment if assessment is not None else self.assess_learner_ability(learner_id)
             if "error" in ability_assessment:
                 return []
             
-            overall_ability = ability_assessment["overall_ability"]["level"]
-            domain_abilities = ability_assessment["domain_abilities"]
-            
-            matched_content = []
-            
-            for content in content_list:
-                # Extract content difficulty and domain
-                content_difficulty = self._extract_content_difficulty(content)
-                content_domain = self._extract_content_domain(content)
-                
-                if not content_difficulty or not content_domain:
-                    continue
-                
-                # Calculate match score
-                match_score = self._calculate_difficulty_match_score(
-                    overall_ability, domain_abilities, content_difficulty, content_domain, content
-                )
-                
-                # Determine if content is appropriate
-                difficulty_gap = abs(content_difficulty - overall_ability["numeric_level"])
-                
-                if difficulty_gap <= 2:  # Within 2 levels is considered appropriate
-                    matched_content.append({
-                        "content_id": content.get("id", content.get("_id", "")),
-                        "title": content.get("title", ""),
-                        "difficulty_level": content_difficulty,
-                        "difficulty_name": self.difficulty_levels[content_difficulty]["name"],
-                        "match_score": round(match_score, 3),
-                        "difficulty_gap": difficulty_gap,
-                        "recommendation_reason": self._generate_match_reason(difficulty_gap, match_score),
-                        "estimated_completion_time": content.get("metadata", {}).get("estimated_completion_time", 60)
-                    })
+            matched_content = None
+            if len(content_list) >= VECTORIZED_MATCH_MIN_CONTENT:
+                try:
+                    matched_content = self._score_content_batch(ability_assessment, content_list)
+                except Exception as e:
+                    # A malformed item breaks the vectorized pass; rescore item by item so only it is dropped
+                    print(f"Error in batch difficulty matching, scoring items individually: {e}")
+            if matched_content is None:
+                matched_content = []
+                for content in content_list:
+                    matched = self._score_content(ability_assessment, content)
+                    if matched:
+                        matched_content.append(matched)
             
             # Sort by match score (highest first)
+            if top_k is not None:
+                return heapq.nlargest(top_k, matched_content, key=lambda x: x["match_score"])
             matched_content.sort(key=lambda x: x["match_score"], reverse=True)
             
             return matched_content
@@ -117,28 +242,196 @@ class DifficultyMatchingAlgorithm:
             print(f"Error in difficulty matching: {e}")
             return []
     
-    def _analyze_domain_performance(self, activities: List[Dict]) -> Dict[str, List[Dict]]:
-        """Analyze performance by learning domain"""
-        domain_performance = {}
+    def _score_content_batch(self, ability_assessment: Dict, content_list: List[Dict]) -> List[Dict]:
+        """Vectorized _score_content over a whole catalog (same scores, one NumPy pass)"""
+        overall_ability = ability_assessment["overall_ability"]
+        domain_abilities = ability_assessment["domain_abilities"]
+        overall_numeric = overall_ability["numeric_level"]
+        
+        difficulties = [self._extract_content_difficulty(content) for content in content_list]
+        domains = [self._extract_content_domain(content) for content in content_list]
+        estimated_times = np.array([_estimated_completion_time(content) for content in content_list], dtype=float)
+        difficulty_arr = np.array(difficulties, dtype=float)
         
+        # Base score from overall ability match
+        gaps = np.abs(difficulty_arr - overall_numeric)
+        base = np.select(
+            [gaps == 0, gaps == 1, gaps == 2],
+            [1.0, 0.9, 0.7],
+            default=np.maximum(0.1, 0.5 - gaps * 0.15)
+        )
+        
+        # Domain-specific ability bonus
+        domain_levels = np.array(
+            [domain_abilities[domain]["numeric_level"] if domain in domain_abilities else np.nan
+             for domain in domains],
+            dtype=float
+        )
+        domain_bonus = np.maximum(0, 0.2 - np.abs(difficulty_arr - domain_levels) * 0.05)
+        base += np.where(np.isnan(domain_levels), 0.0, domain_bonus)
+        
+        # Duration bonus (45-120 minutes) / penalty for very long content
+        base += np.where((estimated_times >= 45) & (estimated_times <= 120), 0.1,
+                         np.where(estimated_times > 180, -0.1, 0.0))
+        match_scores = np.clip(base, 0.0, 1.0)
+        
+        matched_content = []
+        for index in np.flatnonzero(gaps <= 2):
+            content = content_list[index]
+            content_difficulty = difficulties[index]
+            if not content_difficulty or not domains[index]:
+                continue
+            match_score = float(match_scores[index])
+            difficulty_gap = abs(content_difficulty - overall_numeric)
+            matched_content.append({
+                "content_id": content.get("id", content.get("_id", "")),
+                "title": content.get("title", ""),
+                "difficulty_level": content_difficulty,
+                "difficulty_name": self.difficulty_levels[content_difficulty]["name"],
+                "match_score": round(match_score, 3),
+                "difficulty_gap": difficulty_gap,
+                "recommendation_reason": self._generate_match_reason(difficulty_gap, match_score),
+                "estimated_completion_time": content.get("metadata", {}).get("estimated_completion_time", 60)
+            })
+        return matched_content
+    
+    def score_one(self, ability_assessment: Dict, content: Dict) -> Optional[float]:
+        """Match score for one content item, or None when it is outside the appropriate range
+        
+        Same score ``match_content_difficulty`` reports, for callers that already hold the
+        assessment and only need the number. A malformed item also yields None.
+        """
+        try:
+            overall_ability = ability_assessment["overall_ability"]
+            
+            content_difficulty = self._extract_content_difficulty(content)
+            content_domain = self._extract_content_domain(content)
+            if not content_difficulty or not content_domain:
+                return None
+            
+            if abs(content_difficulty - overall_ability["numeric_level"]) > 2:
+                return None
+            
+            match_score = self._calculate_difficulty_match_score(
+                overall_ability, ability_assessment["domain_abilities"], content_difficulty, content_domain, content
+            )
+            return round(match_score, 3)
+        
+        except Exception as e:
+            print(f"Error in difficulty matching: {e}")
+            return None
+    
+    def _score_content(self, ability_assessment: Dict, content: Dict) -> Optional[Dict]:
+        """Match entry for one content item, or None when it is outside the appropriate range or malformed"""
+        try:
+            overall_ability = ability_assessment["overall_ability"]
+            domain_abilities = ability_assessment["domain_abilities"]
+            
+            # Extract content difficulty and domain
+            content_difficulty = self._extract_content_difficulty(content)
+            content_domain = self._extract_content_domain(content)
+            
+            if not content_difficulty or not content_domain:
+                return None
+            
+            # Calculate match score
+            match_score = self._calculate_difficulty_match_score(
+                overall_ability, domain_abilities, content_difficulty, content_domain, content
+            )
+            
+            # Determine if content is appropriate
+            difficulty_gap = abs(content_difficulty - overall_ability["numeric_level"])
+            
+            if difficulty_gap > 2:  # Within 2 levels is considered appropriate
+                return None
+            
+            return {
+                "content_id": content.get("id", content.get("_id", "")),
+                "title": content.get("title", ""),
+                "difficulty_level": content_difficulty,
+                "difficulty_name": self.difficulty_levels[content_difficulty]["name"],
+                "match_score": round(match_score, 3),
+                "difficulty_gap": difficulty_gap,
+                "recommendation_reason": self._generate_match_reason(difficulty_gap, match_score),
+                "estimated_completion_time": content.get("metadata", {}).get("estimated_completion_time", 60)
+            }
+        
+        except Exception as e:
+            print(f"Error in difficulty matching: {e}")
+            return None
+    
+    def _build_activity_frame(self, activities: List[Dict]) -> pd.DataFrame:
+        """Columnar view of an activity log: type, numeric score, raw timestamp and domain"""
+        activity_frame = pd.DataFrame({
+            "activity_type": [activity.get("activity_type", "") for activity in activities],
+            "score": pd.to_numeric(pd.Series([activity.get("score", 0) for activity in activities], dtype=object)),
+            "timestamp": pd.Series([activity.get("timestamp", "") for activity in activities], dtype=object),
+        })
+        
+        # First matching domain in priority order, "general" otherwise
+        activity_types = activity_frame["activity_type"].str.lower()
+        activity_frame["domain"] = np.select(
+            [activity_types.str.contains(pattern, regex=True, na=False)
+             for _, pattern in self._ACTIVITY_DOMAIN_PATTERNS],
+            [domain for domain, _ in self._ACTIVITY_DOMAIN_PATTERNS],
+            default="general"
+        )
+        return activity_frame
+    
+    def _analyze_domain_performance(self, activities: List[Dict],
+                                    activity_frame: Optional[pd.DataFrame] = None) -> Dict[str, Dict]:
+        """Analyze performance by learning domain (per-domain score statistics via pandas groupby)"""
+        if activity_frame is None:
+            if len(activities) < PANDAS_DOMAIN_MIN_ACTIVITIES:
+                return self._analyze_domain_performance_scalar(activities)
+            activity_frame = self._build_activity_frame(activities)
+        
+        scores = activity_frame.groupby("domain", sort=False)["score"]
+        domain_stats = pd.DataFrame({
+            "activity_count": scores.size(),
+            "score_count": scores.count(),
+            "mean": scores.mean(),
+            "var": scores.var(ddof=0),
+            "min": scores.min(),
+            "max": scores.max()
+        })
+        return domain_stats.to_dict("index")
+    
+    def _analyze_domain_performance_scalar(self, activities: List[Dict]) -> Dict[str, Dict]:
+        """Same per-domain statistics as the groupby path, using math.fsum on short score lists"""
+        domain_counts = {}
+        domain_scores = {}
         for activity in activities:
             domain = self._extract_domain_from_activity(activity)
-            if domain:
-                if domain not in domain_performance:
-                    domain_performance[domain] = []
-                
-                domain_performance[domain].append({
-                    "score": activity.get("score", 0),
-                    "duration": activity.get("duration", 0),
-                    "activity_type": activity.get("activity_type", ""),
-                    "timestamp": activity.get("timestamp", "")
-                })
-        
-        return domain_performance
-    
-    def _calculate_ability_level(self, domain_activities: List[Dict]) -> Dict[str, any]:
-        """Calculate ability level for a specific domain"""
-        if not domain_activities:
+            domain_counts[domain] = domain_counts.get(domain, 0) + 1
+            scores = domain_scores.setdefault(domain, [])
+            score = activity.get("score", 0)
+            if score is not None:
+                scores.append(score)
+        
+        domain_stats = {}
+        for domain, activity_count in domain_counts.items():
+            scores = domain_scores[domain]
+            score_count = len(scores)
+            if score_count:
+                mean = math.fsum(scores) / score_count
+                variance = math.fsum((score - mean) ** 2 for score in scores) / score_count
+                score_min, score_max = min(scores), max(scores)
+            else:
+                mean = variance = score_min = score_max = float("nan")
+            domain_stats[domain] = {
+                "activity_count": activity_count,
+                "score_count": score_count,
+                "mean": mean,
+                "var": variance,
+                "min": score_min,
+                "max": score_max
+            }
+        return domain_stats
+    
+    def _calculate_ability_level(self, performance: Dict) -> Dict[str, any]:
+        """Calculate ability level for a specific domain from its score statistics"""
+        if not performance or not performance["activity_count"]:
             return {
                 "level": "beginner",
                 "numeric_level": 2,
@@ -146,9 +439,7 @@ class DifficultyMatchingAlgorithm:
                 "evidence": "No data available"
             }
         
-        scores = [a["score"] for a in domain_activities if a["score"] is not None]
-        
-        if not scores:
+        if not performance["score_count"]:
             return {
                 "level": "beginner",
                 "numeric_level": 2,
@@ -157,27 +448,13 @@ class DifficultyMatchingAlgorithm:
             }
         
         # Calculate average score and trend
-        avg_score = np.mean(scores)
+        avg_score = performance["mean"]
         
         # Determine ability level based on average score
-        if avg_score >= 90:
-            level = "expert"
-            numeric_level = 9
-        elif avg_score >= 80:
-            level = "advanced"
-            numeric_level = 7
-        elif avg_score >= 70:
-            level = "intermediate"
-            numeric_level = 5
-        elif avg_score >= 60:
-            level = "novice"
-            numeric_level = 3
-        else:
-            level = "beginner"
-            numeric_level = 2
+        level, numeric_level = self._score_levels[np.searchsorted(self._score_thresholds, avg_score, side="right")]
         
         # Calculate confidence based on activity count and consistency
-        activity_count = len(domain_activities)
+        activity_count = performance["activity_count"]
         if activity_count >= 10:
             confidence = 0.9
         elif activity_count >= 5:
@@ -188,8 +465,8 @@ class DifficultyMatchingAlgorithm:
             confidence = 0.3
         
         # Adjust confidence based on score consistency
-        if len(scores) > 1:
-            score_variance = np.var(scores)
+        if performance["score_count"] > 1:
+            score_variance = performance["var"]
             if score_variance < 100:  # Low variance = high confidence
                 confidence += 0.1
             elif score_variance > 400:  # High variance = lower confidence
@@ -203,7 +480,7 @@ class DifficultyMatchingAlgorithm:
             "confidence": round(confidence, 3),
             "average_score": round(avg_score, 2),
             "activity_count": activity_count,
-            "score_range": [min(scores), max(scores)]
+            "score_range": [performance["min"], performance["max"]]
         }
     
     def _calculate_overall_ability(self, domain_abilities: Dict) -> Dict[str, any]:
@@ -215,20 +492,15 @@ class DifficultyMatchingAlgorithm:
                 "confidence": 0.3
             }
         
-        # Calculate weighted average numeric level
-        total_weight = 0
-        weighted_level = 0
-        total_confidence = 0
-        
-        for domain, ability in domain_abilities.items():
-            weight = ability["confidence"]
-            weighted_level += ability["numeric_level"] * weight
-            total_weight += weight
-            total_confidence += ability["confidence"]
+        # Confidence-weighted average numeric level
+        levels = np.fromiter((ability["numeric_level"] for ability in domain_abilities.values()),
+                             dtype=float, count=len(domain_abilities))
+        confidences = np.fromiter((ability["confidence"] for ability in domain_abilities.values()),
+                                  dtype=float, count=len(domain_abilities))
         
-        if total_weight > 0:
-            overall_numeric_level = weighted_level / total_weight
-            avg_confidence = total_confidence / len(domain_abilities)
+        if confidences.sum() > 0:
+            overall_numeric_level = float(np.average(levels, weights=confidences))
+            avg_confidence = float(confidences.mean())
         else:
             overall_numeric_level = 2
             avg_confidence = 0.3
@@ -245,35 +517,13 @@ class DifficultyMatchingAlgorithm:
     
     def _numeric_to_level(self, numeric_level: float) -> str:
         """Convert numeric level to level name"""
-        if numeric_level >= 9:
-            return "expert"
-        elif numeric_level >= 7:
-            return "advanced"
-        elif numeric_level >= 5:
-            return "intermediate"
-        elif numeric_level >= 3:
-            return "novice"
-        else:
-            return "beginner"
+        return self._numeric_levels[np.searchsorted(self._numeric_thresholds, numeric_level, side="right")]
     
     def _extract_domain_from_activity(self, activity: Dict) -> Optional[str]:
         """Extract learning domain from activity"""
         activity_type = activity.get("activity_type", "").lower()
-        
-        domain_mapping = {
-            "programming": ["python", "code", "programming", "algorithm"],
-            "data_science": ["data", "analytics", "statistics", "machine_learning"],
-            "web_development": ["web", "html", "css", "javascript"],
-            "mathematics": ["math", "algebra", "calculus"],
-            "language": ["english", "writing", "communication"],
-            "design": ["design", "ux", "ui", "graphics"]
-        }
-        
-        for domain, keywords in domain_mapping.items():
-            if any(keyword in activity_type for keyword in keywords):
-                return domain
-        
-        return "general"
+        match = self._ACTIVITY_DOMAIN_REGEX.match(activity_type)
+        return match.lastgroup if match else "general"
     
     def _extract_content_difficulty(self, content: Dict) -> Optional[int]:
         """Extract difficulty level from content"""
@@ -285,46 +535,26 @@ class DifficultyMatchingAlgorithm:
                 return difficulty_score
         
         # Fall back to text-based difficulty
-        difficulty_text = content.get("difficulty_level", "").lower()
-        
-        difficulty_mapping = {
-            "beginner": 2,
-            "novice": 3,
-            "elementary": 4,
-            "intermediate": 5,
-            "upper intermediate": 6,
-            "advanced": 7,
-            "expert": 8,
-            "master": 9,
-            "professional": 10
-        }
-        
-        return difficulty_mapping.get(difficulty_text, 5)  # Default to intermediate
+        return self._difficulty_from_text(content.get("difficulty_level", ""))
+    
+    def _difficulty_from_text(self, difficulty_level: str) -> int:
+        """Map a difficulty label to its numeric level (memoized per instance)"""
+        return self._DIFFICULTY_TEXT_LEVELS.get(difficulty_level.lower(), 5)  # Default to intermediate
     
     def _extract_content_domain(self, content: Dict) -> Optional[str]:
         """Extract domain from content"""
         # Extract from course_id or title
-        course_id = content.get("course_id", "").lower()
-        title = content.get("title", "").lower()
-        content_type = content.get("content_type", "").lower()
-        
+        return self._domain_from_text(
+            content.get("course_id", ""), content.get("title", ""), content.get("content_type", "")
+        )
+    
+    def _domain_from_text(self, course_id: str, title: str, content_type: str) -> str:
+        """Classify content text fields into a domain (memoized per instance)"""
         # Combine all text for analysis
-        text_to_analyze = f"{course_id} {title} {content_type}"
-        
-        domain_mapping = {
-            "programming": ["python", "code", "programming", "software"],
-            "data_science": ["data", "analytics", "statistics", "machine_learning", "ai"],
-            "web_development": ["web", "html", "css", "javascript", "frontend", "react"],
-            "mathematics": ["math", "algebra", "calculus", "statistics"],
-            "language": ["english", "writing", "communication", "language"],
-            "design": ["design", "ux", "ui", "graphics", "visual"]
-        }
+        text_to_analyze = f"{course_id.lower()} {title.lower()} {content_type.lower()}"
         
-        for domain, keywords in domain_mapping.items():
-            if any(keyword in text_to_analyze for keyword in keywords):
-                return domain
-        
-        return "general"
+        match = self._CONTENT_DOMAIN_REGEX.match(text_to_analyze)
+        return match.lastgroup if match else "general"
     
     def _calculate_difficulty_match_score(self, overall_ability: Dict, domain_abilities: Dict, 
                                         content_difficulty: int, content_domain: str, content: Dict) -> float:
@@ -352,8 +582,7 @@ class DifficultyMatchingAlgorithm:
             base_score += domain_bonus
         
         # Adjust for content quality indicators
-        metadata = content.get("metadata", {})
-        estimated_time = metadata.get("estimated_completion_time", 60)
+        estimated_time = _estimated_completion_time(content)
         
         # Bonus for appropriate duration (45-120 minutes)
         if 45 <= estimated_time <= 120:
@@ -377,7 +606,8 @@ class DifficultyMatchingAlgorithm:
             else:
                 return f"May be too {'easy' if difficulty_gap > 2 else 'difficult'} for current level"
     
-    def _calculate_assessment_confidence(self, activities: List[Dict]) -> float:
+    def _calculate_assessment_confidence(self, activities: List[Dict],
+                                         activity_frame: Optional[pd.DataFrame] = None) -> float:
         """Calculate confidence in ability assessment"""
         if not activities:
             return 0.3
@@ -393,17 +623,12 @@ class DifficultyMatchingAlgorithm:
         else:
             confidence = 0.4
         
-        # Consider recency of activities
-        recent_activities = 0
-        cutoff_date = datetime.now() - timedelta(days=30)
-        
-        for activity in activities:
-            try:
-                activity_date = datetime.fromisoformat(activity.get("timestamp", "").replace('Z', '+00:00'))
-                if activity_date >= cutoff_date:
-                    recent_activities += 1
-            except (ValueError, TypeError):
-                continue
+        # Consider recency of activities; unparseable timestamps become NaT and never count
+        cutoff_date = pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=30)
+        timestamps = (activity_frame["timestamp"] if activity_frame is not None
+                      else [activity.get("timestamp", "") for activity in activities])
+        activity_dates = pd.to_datetime(timestamps, errors="coerce", utc=True, format="ISO8601")
+        recent_activities = int((activity_dates >= cutoff_date).sum())
         
         # Boost confidence if recent activities exist
         if recent_activities > 0:
@@ -440,6 +665,37 @@ class AdaptiveRecommendationEngine:
             "progression_value": 0.15,
             "engagement_potential": 0.1
         }
+        
+        # Weights in sub-score order for the vectorized combination
+        self._score_factors = tuple(self.recommendation_weights)
+        self._weight_vector = np.array([self.recommendation_weights[factor] for factor in self._score_factors])
+        
+        # Learning style preferences, each compiled to one alternation. Content types are
+        # matched as substrings ("hands_on_project", "lecture_audio"), so a token set would
+        # miss compound names
+        style_content_mapping = {
+            "Visual": ("video", "infographic", "diagram", "chart"),
+            "Auditory": ("audio", "podcast", "discussion", "lecture"),
+            "Kinesthetic": ("interactive", "simulation", "hands_on", "project"),
+            "Reading/Writing": ("article", "text", "documentation", "written"),
+            "Mixed": ("video", "article", "interactive")  # Broad preferences
+        }
+        self._style_content_regexes = {
+            style: re.compile("|".join(re.escape(content_type) for content_type in content_types))
+            for style, content_types in style_content_mapping.items()
+        }
+        self._partial_style_regex = re.compile("educational|learning|tutorial")
+        
+        # Common topic keywords, matched as substrings in one regex scan. The lookahead
+        # lets findall report keywords at every position (no keyword is a prefix of another)
+        self._topic_keywords = (
+            "python", "programming", "data science", "machine learning", "web development",
+            "mathematics", "statistics", "algorithms", "database", "networking",
+            "design", "ux", "ui", "language", "writing", "communication"
+        )
+        self._topic_regex = re.compile(
+            "(?=(" + "|".join(re.escape(keyword) for keyword in self._topic_keywords) + "))"
+        )
     
     def generate_adaptive_recommendations(self, learner_id: str, num_recommendations: int = 5) -> Dict[str, any]:
         """Generate comprehensive adaptive recommendations"""
@@ -453,24 +709,39 @@ class AdaptiveRecommendationEngine:
             if not all_content:
                 return {"error": "No content available for recommendations"}
             
+            # Assess ability once for the whole catalog
+            assessment = self.difficulty_matcher.assess_learner_ability(learner_id)
+            
             # Generate recommendations based on multiple factors
-            recommendations = []
+            learner_context = self._prepare_learner_context(learner_data)
+            candidates = []
             
             for content in all_content:
-                recommendation_score = self._calculate_adaptive_score(learner_data, content)
-                
-                if recommendation_score["total_score"] > 0.3:  # Minimum threshold
-                    recommendations.append({
-                        "content": content,
-                        "score_breakdown": recommendation_score,
-                        "total_score": recommendation_score["total_score"]
-                    })
+                difficulty_score = self._calculate_difficulty_score(assessment, content)
+                candidates.append((content, self._calculate_score_breakdown(
+                    learner_data, assessment, content, difficulty_score, learner_context
+                )))
             
-            # Sort by total score
-            recommendations.sort(key=lambda x: x["total_score"], reverse=True)
+            # Weighted totals for all candidates at once
+            recommendations = []
+            if candidates:
+                score_columns = np.array(
+                    [[breakdown[factor] for factor in self._score_factors] for _, breakdown in candidates],
+                    dtype=np.float64
+                ).T
+                totals = _combine_scores(*np.ascontiguousarray(score_columns), self._weight_vector)
+                
+                for (content, breakdown), total in zip(candidates, totals.tolist()):
+                    breakdown["total_score"] = round(total, 3)
+                    if breakdown["total_score"] > RECOMMENDATION_MIN_SCORE:
+                        recommendations.append({
+                            "content": content,
+                            "score_breakdown": breakdown,
+                            "total_score": breakdown["total_score"]
+                        })
             
-            # Select top recommendations
-            top_recommendations = recommendations[:num_recommendations]
+            # Select top recommendations by total score (partial sort, ties keep catalog order)
+            top_recommendations = heapq.nlargest(num_recommendations, recommendations, key=lambda x: x["total_score"])
             
             # Generate learning path suggestions
             learning_path = self._generate_learning_path(learner_data, top_recommendations)
@@ -487,91 +758,89 @@ class AdaptiveRecommendationEngine:
         except Exception as e:
             return {"error": f"Adaptive recommendation generation failed: {str(e)}"}
     
-    def _calculate_adaptive_score(self, learner_data: Dict, content: Dict) -> Dict[str, float]:
-        """Calculate comprehensive adaptive score for content"""
-        
-        # Difficulty match score
-        difficulty_scores = self.difficulty_matcher.match_content_difficulty(
-            learner_data["id"], [content]
+    def _prepare_learner_context(self, learner_data: Dict) -> Dict:
+        """Precompute the learner-side values every content scorer reuses"""
+        return {
+            "preferences": [preference.lower() for preference in learner_data.get("preferences", [])],
+            "activity_types": [
+                activity.get("activity_type", "").lower() for activity in learner_data.get("activities", [])
+            ],
+            "baseline_level": self.difficulty_matcher._calculate_overall_ability({})["numeric_level"]
+        }
+    
+    def _calculate_difficulty_score(self, assessment: Dict, content: Dict) -> float:
+        """Calculate the difficulty match score for one content item (neutral when out of range)"""
+        if "error" in assessment:
+            return 0.5
+        match_score = self.difficulty_matcher.score_one(assessment, content)
+        return match_score if match_score is not None else 0.5
+    
+    def _prepare_content_view(self, content: Dict) -> _ContentView:
+        """Lowercase the content's text fields once for all the per-content scorers"""
+        title_l = content.get("title", "").lower()
+        desc_l = content.get("description", "").lower()
+        type_l = content.get("content_type", "").lower()
+        course_l = content.get("course_id", "").lower()
+        tags_l = [tag.lower() for tag in content.get("tags", [])]
+        return _ContentView(
+            content=content,
+            title_l=title_l,
+            desc_l=desc_l,
+            type_l=type_l,
+            course_l=course_l,
+            tags_l=tags_l,
+            combined_l=f"{title_l} {desc_l} {course_l} {' '.join(tags_l)}",
+            difficulty=self.difficulty_matcher._extract_content_difficulty(content)
         )
-        difficulty_score = difficulty_scores[0]["match_score"] if difficulty_scores else 0.5
-        
-        # Learning style match score
-        learning_style_score = self._calculate_learning_style_match(learner_data, content)
-        
-        # Interest/preference match score
-        interest_score = self._calculate_interest_match(learner_data, content)
-        
-        # Progression value score
-        progression_score = self._calculate_progression_value(learner_data, content)
-        
-        # Engagement potential score
-        engagement_score = self._calculate_engagement_potential(learner_data, content)
+    
+    def _calculate_score_breakdown(self, learner_data: Dict, assessment: Dict, content: Dict,
+                                   difficulty_score: Optional[float] = None,
+                                   learner_context: Optional[Dict] = None) -> Dict[str, float]:
+        """Calculate the adaptive sub-scores for content (weighted into a total by the caller)"""
+        if learner_context is None:
+            learner_context = self._prepare_learner_context(learner_data)
         
-        # Calculate weighted total score
-        total_score = (
-            difficulty_score * self.recommendation_weights["difficulty_match"] +
-            learning_style_score * self.recommendation_weights["learning_style_match"] +
-            interest_score * self.recommendation_weights["interest_match"] +
-            progression_score * self.recommendation_weights["progression_value"] +
-            engagement_score * self.recommendation_weights["engagement_potential"]
-        )
+        # Difficulty match score
+        if difficulty_score is None:
+            difficulty_score = self._calculate_difficulty_score(assessment, content)
         
+        view = self._prepare_content_view(content)
         return {
             "difficulty_match": difficulty_score,
-            "learning_style_match": learning_style_score,
-            "interest_match": interest_score,
-            "progression_value": progression_score,
-            "engagement_potential": engagement_score,
-            "total_score": round(total_score, 3)
+            "learning_style_match": self._calculate_learning_style_match(learner_data, view),
+            "interest_match": self._calculate_interest_match(learner_context, view),
+            "progression_value": self._calculate_progression_value(learner_context, view),
+            "engagement_potential": self._calculate_engagement_potential(view)
         }
     
-    def _calculate_learning_style_match(self, learner_data: Dict, content: Dict) -> float:
+    def _calculate_learning_style_match(self, learner_data: Dict, view: _ContentView) -> float:
         """Calculate how well content matches learner's learning style"""
         learner_style = learner_data.get("learning_style", "Mixed")
-        content_type = content.get("content_type", "").lower()
-        
-        # Learning style preferences
-        style_content_mapping = {
-            "Visual": ["video", "infographic", "diagram", "chart"],
-            "Auditory": ["audio", "podcast", "discussion", "lecture"],
-            "Kinesthetic": ["interactive", "simulation", "hands_on", "project"],
-            "Reading/Writing": ["article", "text", "documentation", "written"],
-            "Mixed": ["video", "article", "interactive"]  # Broad preferences
-        }
-        
-        preferred_content_types = style_content_mapping.get(learner_style, style_content_mapping["Mixed"])
+        content_type = view.type_l
         
         # Check if content type matches preferences
-        for preferred_type in preferred_content_types:
-            if preferred_type in content_type:
-                return 1.0
+        preferred_regex = self._style_content_regexes.get(learner_style, self._style_content_regexes["Mixed"])
+        if preferred_regex.search(content_type):
+            return 1.0
         
         # Partial match
-        if any(keyword in content_type for keyword in ["educational", "learning", "tutorial"]):
+        if self._partial_style_regex.search(content_type):
             return 0.6
         
         return 0.3  # Default low score
     
-    def _calculate_interest_match(self, learner_data: Dict, content: Dict) -> float:
+    def _calculate_interest_match(self, learner_context: Dict, view: _ContentView) -> float:
         """Calculate how well content matches learner interests"""
-        learner_preferences = learner_data.get("preferences", [])
+        learner_preferences = learner_context["preferences"]
         if not learner_preferences:
             return 0.5
         
-        # Extract content topics
-        content_title = content.get("title", "").lower()
-        content_description = content.get("description", "").lower()
-        content_tags = [tag.lower() for tag in content.get("tags", [])]
-        content_course_id = content.get("course_id", "").lower()
-        
-        # Combine all content text
-        content_text = f"{content_title} {content_description} {content_course_id} {' '.join(content_tags)}"
+        # All content text (title, description, course id and tags)
+        content_text = view.combined_l
         
         # Calculate interest match
         match_score = 0.0
-        for preference in learner_preferences:
-            preference_lower = preference.lower()
+        for preference_lower in learner_preferences:
             if preference_lower in content_text:
                 match_score += 1.0
         
@@ -581,36 +850,28 @@ class AdaptiveRecommendationEngine:
         
         return min(1.0, match_score)
     
-    def _calculate_progression_value(self, learner_data: Dict, content: Dict) -> float:
+    def _calculate_progression_value(self, learner_context: Dict, view: _ContentView) -> float:
         """Calculate how valuable content is for learner's progression"""
-        learner_activities = learner_data.get("activities", [])
+        activity_types = learner_context["activity_types"]
         
-        if not learner_activities:
+        if not activity_types:
             return 0.8  # High value for new learners
         
-        # Check if content covers new topics
-        content_topics = self._extract_content_topics(content)
-        completed_topics = set()
-        
-        for activity in learner_activities:
-            activity_type = activity.get("activity_type", "").lower()
-            # Extract completed topics from activities
-            for topic in content_topics:
-                if topic.lower() in activity_type:
-                    completed_topics.add(topic.lower())
+        # Check if content covers new topics, i.e. topics no activity type mentions
+        content_topics = self._extract_content_topics(view)
+        completed_topics = {
+            topic for topic in (t.lower() for t in content_topics)
+            if any(topic in activity_type for activity_type in activity_types)
+        }
         
         # Calculate novelty score
-        new_topics = len(content_topics) - len(completed_topics.intersection(set([t.lower() for t in content_topics])))
+        new_topics = len(content_topics) - len(completed_topics)
         total_topics = len(content_topics) if content_topics else 1
         
         novelty_score = new_topics / total_topics
         
-        # Consider content difficulty for progression
-        difficulty_score = self.difficulty_matcher._extract_content_difficulty(content)
-        learner_ability = self.difficulty_matcher._calculate_overall_ability({})
-        
-        # Optimal progression: content slightly above current ability
-        difficulty_gap = difficulty_score - learner_ability["numeric_level"]
+        # Optimal progression: content slightly above current ability (difficulty from the view)
+        difficulty_gap = view.difficulty - learner_context["baseline_level"]
         if 0.5 <= difficulty_gap <= 2.0:  # Slightly challenging
             progression_bonus = 0.3
         elif difficulty_gap <= 0:  # Too easy
@@ -620,9 +881,9 @@ class AdaptiveRecommendationEngine:
         
         return min(1.0, novelty_score + progression_bonus)
     
-    def _calculate_engagement_potential(self, learner_data: Dict, content: Dict) -> float:
+    def _calculate_engagement_potential(self, view: _ContentView) -> float:
         """Calculate potential for learner engagement with content"""
-        content_type = content.get("content_type", "").lower()
+        content_type = view.type_l
         
         # Engagement factors by content type
         engagement_factors = {
@@ -642,7 +903,7 @@ class AdaptiveRecommendationEngine:
                 base_engagement = max(base_engagement, engagement_value)
         
         # Adjust based on content length
-        estimated_time = content.get("metadata", {}).get("estimated_completion_time", 60)
+        estimated_time = _estimated_completion_time(view.content)
         
         # Optimal engagement: 30-90 minutes
         if 30 <= estimated_time <= 90:
@@ -652,8 +913,9 @@ class AdaptiveRecommendationEngine:
         
         return max(0.1, min(1.0, base_engagement))
     
-    def _extract_content_topics(self, content: Dict) -> List[str]:
+    def _extract_content_topics(self, view: _ContentView) -> List[str]:
         """Extract topics from content"""
+        content = view.content
         topics = []
         
         # From tags
@@ -664,20 +926,9 @@ class AdaptiveRecommendationEngine:
         if isinstance(metadata, dict):
             topics.extend(metadata.get("topics", []))
         
-        # From title and description (simple keyword extraction)
-        title = content.get("title", "").lower()
-        description = content.get("description", "").lower()
-        
-        # Common topic keywords
-        topic_keywords = [
-            "python", "programming", "data science", "machine learning", "web development",
-            "mathematics", "statistics", "algorithms", "database", "networking",
-            "design", "ux", "ui", "language", "writing", "communication"
-        ]
-        
-        for keyword in topic_keywords:
-            if keyword in title or keyword in description:
-                topics.append(keyword)
+        # From title and description (simple keyword extraction); NUL keeps the two
+        # fields apart so no keyword can match across them
+        topics.extend(self._topic_regex.findall(f"{view.title_l}\0{view.desc_l}"))
         
         return list(set(topics))  # Remove duplicates
     
@@ -709,11 +960,12 @@ class AdaptiveRecommendationEngine:
 difficulty_matcher = DifficultyMatchingAlgorithm()
 adaptive_recommender = AdaptiveRecommendationEngine()
 
-def match_content_difficulty(learner_id: str, content_list: List[Dict] = None) -> List[Dict]:
+def match_content_difficulty(learner_id: str, content_list: List[Dict] = None,
+                             top_k: Optional[int] = None) -> List[Dict]:
     """Main function to match content difficulty"""
     if content_list is None:
         content_list = read_contents()
-    return difficulty_matcher.match_content_difficulty(learner_id, content_list)
+    return difficulty_matcher.match_content_difficulty(learner_id, content_list, top_k=top_k)
 
 def generate_adaptive_recommendations(learner_id: str, num_recommendations: int = 5) -> Dict[str, any]:
     """Main function to generate adaptive recommendations"""
@@ -3,70 +3,105 @@ import os
 import json
 import joblib
 import numpy as np
-from sklearn.mixture import GaussianMixture
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+# Optional streaming JSON parser for large engagement files (falls back to json.load)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+def _engagement_rows(f):
+    """Yield (learner_id, duration, score) per engagement, streaming the array when ijson is installed"""
+    engagements = ijson.items(f, 'item', use_float=True) if IJSON_AVAILABLE else json.load(f)
+    for e in engagements:
+        yield e.get('learner_id'), e.get('duration'), e.get('score')
 
 def aggregate_engagement_data(engagements_file='data/engagements.json', learners_file='data/learners.json'):
-    with open(engagements_file) as f:
-        engagements = json.load(f)
+    # Only the three needed fields are kept per engagement, never the full list of dicts
+    with open(engagements_file, 'rb') as f:
+        events = pd.DataFrame.from_records(_engagement_rows(f), columns=['learner_id', 'duration', 'score'])
     with open(learners_file) as f:
         learners = json.load(f)
     
-    learner_data = {l['id']: {'total_time': 0, 'scores': [], 'style': l['learning_style']} for l in learners}
+    learner_styles = {l['id']: l['learning_style'] for l in learners}
     
-    for e in engagements:
-        lid = e['learner_id']
-        if lid in learner_data:
-            learner_data[lid]['total_time'] += e.get('duration', 0) or 0
-            if e.get('score') is not None:
-                learner_data[lid]['scores'].append(e['score'])
+    # Total time and mean score per learner in one groupby; missing durations count as 0,
+    # missing scores are left out of the mean
+    events['duration'] = pd.to_numeric(events['duration'], errors='coerce').fillna(0)
+    events['score'] = pd.to_numeric(events['score'], errors='coerce')
+    per_learner = events.groupby('learner_id').agg(total_time=('duration', 'sum'), avg_score=('score', 'mean'))
     
-    features = []
-    styles = []
-    for lid, data in learner_data.items():
-        avg_score = np.mean(data['scores']) if data['scores'] else 0
-        features.append([data['total_time'], avg_score])
-        styles.append(data['style'])
+    # Learners without engagements (or without scores) get 0, in learners-file order
+    per_learner = per_learner.reindex(list(learner_styles)).fillna(0)
+    features = per_learner[['total_time', 'avg_score']].to_numpy(dtype=float)
     
-    return np.array(features), styles
+    return features, list(learner_styles.values())
 
 def train_kmeans_with_styles(engagements_file='data/engagements.json', learners_file='data/learners.json', n_clusters=3):
     X, styles = aggregate_engagement_data(engagements_file, learners_file)
-    gm = GaussianMixture(n_components=n_clusters, random_state=42)
-    gm.fit(X)
+    km = MiniBatchKMeans(n_clusters=n_clusters, batch_size=1024, n_init=3, random_state=42)
+    km.fit(X)
 
-    # Derive learning_style per cluster (most common style in cluster)
+    # Derive learning_style per cluster (most common style in cluster) from a
+    # cluster x style count table built with one bincount
+    labels = km.predict(X)
+    style_names, style_codes = np.unique(styles, return_inverse=True)
+    counts = np.bincount(
+        labels * len(style_names) + style_codes, minlength=n_clusters * len(style_names)
+    ).reshape(n_clusters, len(style_names))
     cluster_styles = {}
     for i in range(n_clusters):
-        cluster_indices = np.where(gm.predict(X) == i)[0]
-        cluster_s = [styles[j] for j in cluster_indices]
-        if cluster_s:
-            most_common = max(set(cluster_s), key=cluster_s.count)
-            cluster_styles[i] = most_common
+        if counts[i].any():
+            cluster_styles[i] = str(style_names[counts[i].argmax()])
         else:
             cluster_styles[i] = 'unknown'
 
-    # Save model and mapping
+    # Save model and mapping (plus the mapping as an array indexed by cluster id for predict)
+    cluster_styles_arr = np.array([cluster_styles[i] for i in range(n_clusters)], dtype=object)
     os.makedirs('ml', exist_ok=True)
-    joblib.dump({'model': gm, 'cluster_styles': cluster_styles}, 'ml/kmeans.pkl')
-    return gm, cluster_styles
+    joblib.dump({'model': km, 'cluster_styles': cluster_styles, 'cluster_styles_arr': cluster_styles_arr},
+                'ml/kmeans.pkl')
+    return km, cluster_styles
 
 def predict_kmeans(X_new):
     if not os.path.exists('ml/kmeans.pkl'):
         raise FileNotFoundError("Model file 'ml/kmeans.pkl' not found. Please train the model first.")
     data = joblib.load('ml/kmeans.pkl')
-    gm = data['model']
-    cluster_styles = data['cluster_styles']
-    clusters = gm.predict(X_new)
-    styles = [cluster_styles[c] for c in clusters]
+    km = data['model']
+    cluster_styles_arr = data.get('cluster_styles_arr')
+    if cluster_styles_arr is None:
+        # Models saved before the array was persisted only carry the dict
+        cluster_styles = data['cluster_styles']
+        cluster_styles_arr = np.array([cluster_styles[i] for i in range(len(cluster_styles))], dtype=object)
+    clusters = km.predict(X_new)
+    styles = cluster_styles_arr[clusters].tolist()
     return styles
 
+def partial_fit_kmeans(X_new):
+    """Update the saved model with new feature rows instead of refitting from scratch.
+
+    The cluster -> learning style mapping is kept; rerun train_kmeans_with_styles to re-derive it.
+    """
+    if not os.path.exists('ml/kmeans.pkl'):
+        raise FileNotFoundError("Model file 'ml/kmeans.pkl' not found. Please train the model first.")
+    data = joblib.load('ml/kmeans.pkl')
+    model = data['model'] if isinstance(data, dict) else data
+    if not hasattr(model, 'partial_fit'):
+        raise TypeError("Saved model does not support incremental updates. Please retrain the model first.")
+    model.partial_fit(X_new)
+    joblib.dump(data, 'ml/kmeans.pkl')
+    return model
+
 # Legacy functions for compatibility
 def train_kmeans(X, n_clusters=3):
-    gm = GaussianMixture(n_components=n_clusters, random_state=42)
-    gm.fit(X)
+    km = MiniBatchKMeans(n_clusters=n_clusters, batch_size=1024, n_init=3, random_state=42)
+    km.fit(X)
     os.makedirs('ml', exist_ok=True)
-    joblib.dump(gm, 'ml/kmeans.pkl')
-    return gm
+    joblib.dump(km, 'ml/kmeans.pkl')
+    return km
 
 # usage:
 # X = df[['avg_time_per_session','video_completion_rate','quiz_accuracy']]
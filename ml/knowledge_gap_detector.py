@@ -3,15 +3,174 @@ Knowledge Gap Detector
 Identifies gaps in learner's knowledge and recommends targeted interventions
 """
 
+import math
+import re
 import numpy as np
+import pandas as pd
 from typing import Dict, List, Tuple, Optional, Set
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
-from utils.crud_operations import read_learner, read_content, read_engagements
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from utils.crud_operations import read_learner, read_content
+from utils.result_cache import ResultCache
+
+# Optional JIT for per-subject score statistics on long activity logs (falls back to pandas)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Distinct activity types whose knowledge area is memoized
+AREA_CACHE_SIZE = 4096
+
+# Activity logs shorter than this are summarized with scalar math (pandas setup dominates)
+PANDAS_GAP_MIN_ACTIVITIES = 64
+
+# Gap analyses memoized per (learner, activity fingerprint)
+RESULT_CACHE_SIZE = 1024
+
+# Batches smaller than this are analyzed in-process (worker start-up costs more than it saves)
+PARALLEL_BATCH_MIN_LEARNERS = 64
+
+
+def _compile_area_regex(area_mapping: Dict[str, Tuple[str, ...]]) -> re.Pattern:
+    """Compile ordered area keywords into one regex whose lastgroup is the first matching area.
+    
+    Each area is a lookahead alternative tried in mapping order at position 0, so the first
+    area with any keyword in the text wins, not the leftmost keyword occurrence.
+    """
+    alternatives = [
+        f"(?=.*?(?:{'|'.join(re.escape(keyword) for keyword in keywords)}))(?P<{area}>)"
+        for area, keywords in area_mapping.items()
+    ]
+    return re.compile("|".join(alternatives), re.DOTALL)
+
+
+@njit(cache=True)
+def _subject_stats_kernel(subject_ids, scores, n_subjects):
+    """Per-subject activity/score counts, mean, population variance, min, max and last-3 mean
+    
+    ``scores`` holds NaN for activities without a score; those count as activities only.
+    """
+    activity_count = np.zeros(n_subjects, dtype=np.int64)
+    score_count = np.zeros(n_subjects, dtype=np.int64)
+    score_sum = np.zeros(n_subjects)
+    min_score = np.full(n_subjects, np.inf)
+    max_score = np.full(n_subjects, -np.inf)
+    recent = np.full((n_subjects, 3), np.nan)  # Ring buffer of each subject's last three scores
+    
+    for i in range(subject_ids.shape[0]):
+        subject = subject_ids[i]
+        score = scores[i]
+        recent[subject, activity_count[subject] % 3] = score
+        activity_count[subject] += 1
+        if not np.isnan(score):
+            score_count[subject] += 1
+            score_sum[subject] += score
+            min_score[subject] = min(min_score[subject], score)
+            max_score[subject] = max(max_score[subject], score)
+    
+    avg_score = np.full(n_subjects, np.nan)
+    for subject in range(n_subjects):
+        if score_count[subject]:
+            avg_score[subject] = score_sum[subject] / score_count[subject]
+        else:
+            min_score[subject] = max_score[subject] = np.nan
+    
+    # Second pass around the mean keeps the variance as stable as the groupby path
+    squared_deviation = np.zeros(n_subjects)
+    for i in range(subject_ids.shape[0]):
+        if not np.isnan(scores[i]):
+            squared_deviation[subject_ids[i]] += (scores[i] - avg_score[subject_ids[i]]) ** 2
+    score_variance = np.where(score_count > 0, squared_deviation / np.maximum(score_count, 1), np.nan)
+    
+    recent_count = np.zeros(n_subjects, dtype=np.int64)
+    recent_avg = np.full(n_subjects, np.nan)
+    for subject in range(n_subjects):
+        recent_sum = 0.0
+        for slot in range(3):
+            if not np.isnan(recent[subject, slot]):
+                recent_count[subject] += 1
+                recent_sum += recent[subject, slot]
+        if recent_count[subject]:
+            recent_avg[subject] = recent_sum / recent_count[subject]
+    
+    return (activity_count, score_count, avg_score, score_variance,
+            min_score, max_score, recent_count, recent_avg)
+
 
 class KnowledgeGapDetector:
     """Detects knowledge gaps and learning weaknesses"""
     
+    # Gap severities from most to least urgent (unknown severities rank 0, last)
+    _SEVERITY_ORDER = {"critical": 4, "significant": 3, "minor": 2, "potential": 1}
+    _PRIORITY_SEVERITIES = frozenset(("critical", "significant"))
+    
+    # Activity-type keywords per knowledge area, checked in priority order
+    _AREA_MAPPING = {
+        "programming": ("python", "code", "programming", "algorithm"),
+        "data_science": ("data", "analytics", "statistics", "machine_learning"),
+        "web_development": ("web", "html", "css", "javascript", "frontend"),
+        "mathematics": ("math", "algebra", "calculus", "statistics"),
+        "language": ("english", "writing", "communication"),
+        "design": ("design", "ux", "ui", "graphics"),
+        "science": ("science", "physics", "chemistry", "biology")
+    }
+    _AREA_REGEX = _compile_area_regex(_AREA_MAPPING)
+    
+    # Activity types that count as assessments
+    _ASSESSMENT_REGEX = re.compile("quiz|test|exam|assessment")
+    
+    # Baseline remediation effort per severity
+    _BASE_EFFORT = {
+        "critical": {"hours": 20, "days": 10},
+        "significant": {"hours": 12, "days": 6},
+        "minor": {"hours": 6, "days": 3},
+        "potential": {"hours": 3, "days": 2}
+    }
+    
+    # Learning objectives per subject
+    _SUBJECT_OBJECTIVES = {
+        "programming": ("syntax_mastery", "problem_solving", "debugging", "best_practices"),
+        "data_science": ("statistical_analysis", "data_visualization", "modeling", "interpretation"),
+        "mathematics": ("conceptual_understanding", "problem_solving", "application", "proof_techniques"),
+        "language": ("vocabulary", "grammar", "composition", "comprehension"),
+        "design": ("principles", "tools", "user_experience", "accessibility")
+    }
+    _DEFAULT_OBJECTIVES = ("fundamental_concepts", "practical_application")
+    
+    # Success metrics per gap type
+    _SUCCESS_METRICS = {
+        "performance_gap": (
+            "Achieve 70%+ average score in subject assessments",
+            "Complete 3 practice exercises with 80%+ accuracy",
+            "Demonstrate understanding in practical application"
+        ),
+        "prerequisite_gap": (
+            "Complete prerequisite course with passing grade",
+            "Pass foundational knowledge assessment",
+            "Demonstrate basic competency in prerequisite skills"
+        ),
+        "consistency_gap": (
+            "Maintain consistent study schedule for 2 weeks",
+            "Reduce score variance by 50%",
+            "Complete daily review exercises"
+        )
+    }
+    _DEFAULT_SUCCESS_METRICS = (
+        "Demonstrate improvement in targeted areas",
+        "Complete prescribed remediation activities",
+        "Achieve competency benchmarks"
+    )
+    
     def __init__(self):
         self.gap_severity_weights = {
             "critical": 1.0,    # Major gap affecting progression
@@ -35,29 +194,51 @@ class KnowledgeGapDetector:
             "language": ["vocabulary", "grammar", "composition", "comprehension"],
             "design": ["principles", "tools", "user_experience", "accessibility"]
         }
+        
+        # Activity logs repeat a handful of types, so the area is memoized per type string
+        self._area_from_type = lru_cache(maxsize=AREA_CACHE_SIZE)(self._area_from_type)
+        
+        # (learner_id, activity fingerprint) -> gap analysis result
+        self._result_cache = ResultCache(RESULT_CACHE_SIZE, learner_of=lambda key: key[0])
     
-    def detect_knowledge_gaps(self, learner_id: str) -> Dict[str, any]:
-        """Detect knowledge gaps for a learner"""
+    def detect_knowledge_gaps(self, learner_id: str, learner_data: Optional[Dict] = None) -> Dict[str, any]:
+        """Detect knowledge gaps for a learner (pass ``learner_data`` when it is already loaded)"""
         try:
-            learner_data = read_learner(learner_id)
+            if learner_data is None:
+                learner_data = read_learner(learner_id)
             if not learner_data:
                 return {"error": "Learner not found"}
             
             activities = learner_data.get("activities", [])
-            engagements = read_engagements()
-            learner_engagements = [e for e in engagements if e.learner_id == learner_id]
             
             if not activities:
                 return self._get_initial_gap_assessment(learner_id)
             
+            # The analysis only reads activity types and scores, so they fingerprint the result
+            # (values, not identities: stored activities can be updated in place)
+            try:
+                cache_key = (learner_id, tuple((a.get("activity_type", ""), a.get("score")) for a in activities))
+                hash(cache_key)
+            except (TypeError, AttributeError):
+                cache_key = None  # Unhashable activity data, analyze without caching
+            
+            if cache_key is not None:
+                cached = self._result_cache.get(cache_key)
+                if cached is not None:
+                    cached["analysis_timestamp"] = datetime.now().isoformat()
+                    return cached
+            
+            # One pass over the activity log feeds all three analyzers
+            activity_stats = self._collect_activity_stats(activities)
+            
             # Analyze performance patterns
-            gap_analysis = self._analyze_performance_gaps(activities, learner_engagements)
+            gap_analysis = self._analyze_performance_gaps(activity_stats)
             
             # Identify knowledge dependencies
-            dependency_gaps = self._analyze_dependency_gaps(activities)
+            dependency_gaps = self._analyze_dependency_gaps(activity_stats)
             
             # Detect learning progression issues
-            progression_gaps = self._analyze_progression_gaps(activities)
+            progression_gaps = self._analyze_progression_gaps(activity_stats)
             
             # Combine all gap types
             comprehensive_gaps = self._consolidate_gaps(gap_analysis, dependency_gaps, progression_gaps)
@@ -65,41 +246,131 @@ class KnowledgeGapDetector:
             # Generate recommendations
             recommendations = self._generate_gap_recommendations(comprehensive_gaps)
             
-            return {
+            result = {
                 "learner_id": learner_id,
                 "gap_analysis": comprehensive_gaps,
                 "recommendations": recommendations,
                 "analysis_timestamp": datetime.now().isoformat(),
                 "total_gaps_identified": len(comprehensive_gaps),
-                "priority_gaps": [gap for gap in comprehensive_gaps if gap["severity"] in ["critical", "significant"]]
+                "priority_gaps": [gap for gap in comprehensive_gaps if gap["severity"] in self._PRIORITY_SEVERITIES]
             }
             
+            if cache_key is not None:
+                self._result_cache.put(cache_key, result)
+            return result
+            
         except Exception as e:
             return {"error": f"Gap detection failed: {str(e)}"}
     
-    def _analyze_performance_gaps(self, activities: List[Dict], engagements: List[Dict]) -> List[Dict]:
+    def clear_cache(self) -> None:
+        """Drop all memoized gap analyses"""
+        self._result_cache.clear()
+    
+    def _collect_activity_stats(self, activities: List[Dict]) -> Dict[str, any]:
+        """Single pass over activities producing the tables every gap analyzer reads
+        
+        ``subject_scores`` maps each knowledge area (in order of first appearance) to its
+        activities' scores in log order, None included; ``type_counts`` counts activity types.
+        """
+        subject_scores = defaultdict(list)
+        type_counts = Counter()
+        for activity in activities:
+            activity_type = activity.get("activity_type", "")
+            subject_scores[self._area_from_type(activity_type)].append(activity.get("score"))
+            type_counts[activity_type] += 1
+        
+        return {
+            "subject_scores": subject_scores,
+            "type_counts": type_counts,
+            "total_activities": len(activities)
+        }
+    
+    def _build_activity_frame(self, subject_scores: Dict[str, List]) -> pd.DataFrame:
+        """One row per activity with its knowledge area and numeric score (NaN when missing)"""
+        return pd.DataFrame({
+            "subject": [subject for subject, scores in subject_scores.items() for _ in scores],
+            "score": pd.to_numeric(pd.Series([score for scores in subject_scores.values() for score in scores],
+                                             dtype=object), errors="coerce")
+        })
+    
+    def _subject_score_stats(self, activity_frame: pd.DataFrame) -> Dict[str, Dict]:
+        """Score statistics per subject/knowledge area via pandas groupby, in order of first appearance"""
+        subject_scores = activity_frame.groupby("subject", sort=False)["score"]
+        recent_scores = activity_frame.groupby("subject", sort=False).tail(3).groupby("subject")["score"]
+        subject_stats = pd.DataFrame({
+            "activity_count": subject_scores.size(),
+            "score_count": subject_scores.count(),
+            "avg_score": subject_scores.mean(),
+            "score_variance": subject_scores.var(ddof=0),
+            "min_score": subject_scores.min(),
+            "max_score": subject_scores.max()
+        })
+        subject_stats["recent_count"] = recent_scores.count()
+        subject_stats["recent_avg"] = recent_scores.mean()
+        return subject_stats.to_dict("index")
+    
+    def _subject_score_stats_jit(self, subject_scores_by_area: Dict[str, List]) -> Dict[str, Dict]:
+        """Same per-subject statistics as the groupby path, from the compiled single-log kernel"""
+        subjects = list(subject_scores_by_area)
+        subject_ids = np.repeat(np.arange(len(subjects), dtype=np.int32),
+                                [len(scores) for scores in subject_scores_by_area.values()])
+        scores = pd.to_numeric(pd.Series([score for scores in subject_scores_by_area.values() for score in scores],
+                                         dtype=object), errors="coerce").to_numpy(dtype=np.float64)
+        stat_columns = _subject_stats_kernel(subject_ids, scores, len(subjects))
+        stat_names = ("activity_count", "score_count", "avg_score", "score_variance",
+                      "min_score", "max_score", "recent_count", "recent_avg")
+        return {
+            subject: {name: column[subject_id].item() for name, column in zip(stat_names, stat_columns)}
+            for subject_id, subject in enumerate(subjects)
+        }
+    
+    def _subject_score_stats_scalar(self, subject_scores_by_area: Dict[str, List]) -> Dict[str, Dict]:
+        """Same per-subject statistics as the groupby path, using math.fsum on short score lists"""
+        subject_stats = {}
+        for subject, subject_scores in subject_scores_by_area.items():
+            scores = [score for score in subject_scores if score is not None]
+            recent_scores = [score for score in subject_scores[-3:] if score is not None]
+            if scores:
+                avg_score = math.fsum(scores) / len(scores)
+                score_variance = math.fsum((score - avg_score) ** 2 for score in scores) / len(scores)
+                min_score, max_score = min(scores), max(scores)
+            else:
+                avg_score = score_variance = min_score = max_score = float("nan")
+            subject_stats[subject] = {
+                "activity_count": len(subject_scores),
+                "score_count": len(scores),
+                "avg_score": avg_score,
+                "score_variance": score_variance,
+                "min_score": min_score,
+                "max_score": max_score,
+                "recent_count": len(recent_scores),
+                "recent_avg": math.fsum(recent_scores) / len(recent_scores) if recent_scores else float("nan")
+            }
+        return subject_stats
+    
+    def _analyze_performance_gaps(self, activity_stats: Dict[str, any]) -> List[Dict]:
         """Analyze performance-based gaps"""
         gaps = []
         
-        # Group activities by subject/knowledge area
-        subject_performance = defaultdict(list)
-        
-        for activity in activities:
-            subject = self._extract_knowledge_area(activity)
-            if subject:
-                subject_performance[subject].append(activity)
+        # Score statistics per subject/knowledge area (long logs via the JIT kernel or a pandas groupby)
+        subject_scores = activity_stats["subject_scores"]
+        if activity_stats["total_activities"] < PANDAS_GAP_MIN_ACTIVITIES:
+            subject_stats = self._subject_score_stats_scalar(subject_scores)
+        elif NUMBA_AVAILABLE:
+            subject_stats = self._subject_score_stats_jit(subject_scores)
+        else:
+            subject_stats = self._subject_score_stats(self._build_activity_frame(subject_scores))
         
         # Analyze each subject for performance gaps
-        for subject, subject_activities in subject_performance.items():
-            scores = [a.get("score", 0) for a in subject_activities if a.get("score") is not None]
-            
-            if not scores:
+        for subject, stats in subject_stats.items():
+            score_count = stats["score_count"]
+            if not score_count:
                 continue
             
-            avg_score = np.mean(scores)
-            score_variance = np.var(scores) if len(scores) > 1 else 0
-            recent_scores = [a.get("score", 0) for a in subject_activities[-3:] if a.get("score") is not None]
-            recent_avg = np.mean(recent_scores) if recent_scores else avg_score
+            avg_score = stats["avg_score"]
+            score_variance = stats["score_variance"] if score_count > 1 else 0
+            recent_count = stats["recent_count"]
+            recent_avg = stats["recent_avg"] if recent_count else avg_score
             
             # Detect different types of performance gaps
             if avg_score < 60:
@@ -113,13 +384,13 @@ class KnowledgeGapDetector:
                         "average_score": avg_score,
                         "recent_average": recent_avg,
                         "score_variance": score_variance,
-                        "activity_count": len(subject_activities)
+                        "activity_count": stats["activity_count"]
                     },
                     "learning_objectives": self._get_subject_learning_objectives(subject)
                 })
             
             # Detect performance inconsistency (high variance)
-            if score_variance > 400 and len(scores) > 3:  # High variance (>20 points)
+            if score_variance > 400 and score_count > 3:  # High variance (>20 points)
                 gaps.append({
                     "type": "consistency_gap",
                     "subject": subject,
@@ -128,15 +399,15 @@ class KnowledgeGapDetector:
                     "description": f"Inconsistent performance in {subject}",
                     "evidence": {
                         "score_variance": score_variance,
-                        "min_score": min(scores),
-                        "max_score": max(scores),
+                        "min_score": stats["min_score"],
+                        "max_score": stats["max_score"],
                         "coefficient_of_variation": np.sqrt(score_variance) / avg_score if avg_score > 0 else 0
                     },
                     "learning_objectives": ["consistency", "practice", "foundational_review"]
                 })
             
             # Detect declining performance
-            if len(recent_scores) >= 3:
+            if recent_count >= 3:
                 if recent_avg < avg_score * 0.8:  # 20% decline
                     gaps.append({
                         "type": "performance_decline",
@@ -154,16 +425,12 @@ class KnowledgeGapDetector:
         
         return gaps
     
-    def _analyze_dependency_gaps(self, activities: List[Dict]) -> List[Dict]:
+    def _analyze_dependency_gaps(self, activity_stats: Dict[str, any]) -> List[Dict]:
         """Analyze gaps due to missing prerequisite knowledge"""
         gaps = []
         
         # Identify subjects being studied
-        subjects_studied = set()
-        for activity in activities:
-            subject = self._extract_knowledge_area(activity)
-            if subject:
-                subjects_studied.add(subject)
+        subjects_studied = set(activity_stats["subject_scores"])
         
         # Check for missing dependencies
         for subject in subjects_studied:
@@ -189,21 +456,19 @@ class KnowledgeGapDetector:
         
         return gaps
     
-    def _analyze_progression_gaps(self, activities: List[Dict]) -> List[Dict]:
+    def _analyze_progression_gaps(self, activity_stats: Dict[str, any]) -> List[Dict]:
         """Analyze gaps in learning progression"""
         gaps = []
         
-        # Sort activities by timestamp
-        sorted_activities = sorted(activities, key=lambda x: x.get("timestamp", ""))
-        
         # Analyze activity type diversity
-        activity_types = [a.get("activity_type", "") for a in sorted_activities]
-        activity_type_counts = Counter(activity_types)
+        activity_type_counts = activity_stats["type_counts"]
         
-        # Detect over-reliance on certain activity types
-        total_activities = len(activities)
-        for activity_type, count in activity_type_counts.items():
-            if count / total_activities > 0.7 and total_activities > 5:  # Over 70% one type
+        # Detect over-reliance on certain activity types; only the most common type can
+        # hold over 70%, so it is the only one checked
+        total_activities = activity_stats["total_activities"]
+        if total_activities > 5:
+            activity_type, count = activity_type_counts.most_common(1)[0]
+            if count / total_activities > 0.7:  # Over 70% one type
                 gaps.append({
                     "type": "activity_diversity_gap",
                     "subject": "general",
@@ -218,11 +483,13 @@ class KnowledgeGapDetector:
                     "learning_objectives": ["varied_practice", "different_learning_methods", "skill_diversification"]
                 })
         
-        # Detect lack of assessment activities
-        assessment_activities = [a for a in activities if any(keyword in a.get("activity_type", "").lower() 
-                               for keyword in ["quiz", "test", "exam", "assessment"])]
+        # Detect lack of assessment activities (checked once per distinct activity type)
+        assessment_count = sum(
+            count for activity_type, count in activity_type_counts.items()
+            if self._ASSESSMENT_REGEX.search(activity_type.lower())
+        )
         
-        if len(assessment_activities) / total_activities < 0.2 and total_activities > 10:
+        if assessment_count / total_activities < 0.2 and total_activities > 10:
             gaps.append({
                 "type": "assessment_gap",
                 "subject": "general",
@@ -230,9 +497,9 @@ class KnowledgeGapDetector:
                 "severity": "significant",
                 "description": "Insufficient assessment activities to measure learning",
                 "evidence": {
-                    "assessment_count": len(assessment_activities),
+                    "assessment_count": assessment_count,
                     "total_activities": total_activities,
-                    "assessment_percentage": (len(assessment_activities) / total_activities) * 100
+                    "assessment_percentage": (assessment_count / total_activities) * 100
                 },
                 "learning_objectives": ["knowledge_assessment", "progress_monitoring", "skill_validation"]
             })
@@ -241,23 +508,19 @@ class KnowledgeGapDetector:
     
     def _consolidate_gaps(self, performance_gaps: List[Dict], dependency_gaps: List[Dict], progression_gaps: List[Dict]) -> List[Dict]:
         """Consolidate all gap types into a comprehensive list"""
-        all_gaps = performance_gaps + dependency_gaps + progression_gaps
-        
-        # Remove duplicate gaps of the same type for the same subject
-        consolidated_gaps = []
-        seen_gaps = set()
+        # Remove duplicate gaps of the same type for the same subject (first one wins); the
+        # dict keeps first-insertion order, so it replaces the separate seen-set and list
+        consolidated_gaps = {}
+        for gap_list in (performance_gaps, dependency_gaps, progression_gaps):
+            for gap in gap_list:
+                consolidated_gaps.setdefault((gap["type"], gap["subject"], gap["knowledge_area"]), gap)
         
-        for gap in all_gaps:
-            gap_key = (gap["type"], gap["subject"], gap["knowledge_area"])
-            if gap_key not in seen_gaps:
-                seen_gaps.add(gap_key)
-                consolidated_gaps.append(gap)
+        # Sort by severity: a stable bucket pass, since there are only a few severity levels
+        severity_buckets = defaultdict(list)
+        for gap in consolidated_gaps.values():
+            severity_buckets[self._SEVERITY_ORDER.get(gap["severity"], 0)].append(gap)
         
-        # Sort by severity
-        severity_order = {"critical": 4, "significant": 3, "minor": 2, "potential": 1}
-        consolidated_gaps.sort(key=lambda x: severity_order.get(x["severity"], 0), reverse=True)
-        
-        return consolidated_gaps
+        return [gap for rank in sorted(severity_buckets, reverse=True) for gap in severity_buckets[rank]]
     
     def _generate_gap_recommendations(self, gaps: List[Dict]) -> List[Dict]:
         """Generate specific recommendations for each gap"""
@@ -320,24 +583,18 @@ class KnowledgeGapDetector:
     
     def _estimate_remediation_effort(self, gap: Dict) -> Dict[str, any]:
         """Estimate effort required to address the gap"""
-        base_effort = {
-            "critical": {"hours": 20, "days": 10},
-            "significant": {"hours": 12, "days": 6},
-            "minor": {"hours": 6, "days": 3},
-            "potential": {"hours": 3, "days": 2}
-        }
-        
         severity = gap["severity"]
-        effort = base_effort.get(severity, base_effort["minor"])
+        effort = self._BASE_EFFORT.get(severity, self._BASE_EFFORT["minor"])
+        hours = effort["hours"]
         
         # Adjust based on gap type
         if gap["type"] == "prerequisite_gap":
-            effort["hours"] *= 1.5  # Prerequisite gaps require more effort
+            hours *= 1.5  # Prerequisite gaps require more effort
         elif gap["type"] == "performance_decline":
-            effort["hours"] *= 1.2
+            hours *= 1.2
         
         return {
-            "estimated_hours": effort["hours"],
+            "estimated_hours": hours,
             "estimated_days": effort["days"],
             "difficulty": "High" if severity == "critical" else "Medium" if severity == "significant" else "Low",
             "urgency": "Immediate" if severity == "critical" else "High" if severity == "significant" else "Normal"
@@ -345,63 +602,20 @@ class KnowledgeGapDetector:
     
     def _define_success_metrics(self, gap: Dict) -> List[str]:
         """Define metrics to measure success in addressing the gap"""
-        if gap["type"] == "performance_gap":
-            return [
-                "Achieve 70%+ average score in subject assessments",
-                "Complete 3 practice exercises with 80%+ accuracy",
-                "Demonstrate understanding in practical application"
-            ]
-        elif gap["type"] == "prerequisite_gap":
-            return [
-                "Complete prerequisite course with passing grade",
-                "Pass foundational knowledge assessment",
-                "Demonstrate basic competency in prerequisite skills"
-            ]
-        elif gap["type"] == "consistency_gap":
-            return [
-                "Maintain consistent study schedule for 2 weeks",
-                "Reduce score variance by 50%",
-                "Complete daily review exercises"
-            ]
-        else:
-            return [
-                "Demonstrate improvement in targeted areas",
-                "Complete prescribed remediation activities",
-                "Achieve competency benchmarks"
-            ]
+        return list(self._SUCCESS_METRICS.get(gap["type"], self._DEFAULT_SUCCESS_METRICS))
     
     def _extract_knowledge_area(self, activity: Dict) -> Optional[str]:
         """Extract knowledge area from activity"""
-        activity_type = activity.get("activity_type", "").lower()
-        
-        # Map activity types to knowledge areas
-        area_mapping = {
-            "programming": ["python", "code", "programming", "algorithm"],
-            "data_science": ["data", "analytics", "statistics", "machine_learning"],
-            "web_development": ["web", "html", "css", "javascript", "frontend"],
-            "mathematics": ["math", "algebra", "calculus", "statistics"],
-            "language": ["english", "writing", "communication"],
-            "design": ["design", "ux", "ui", "graphics"],
-            "science": ["science", "physics", "chemistry", "biology"]
-        }
-        
-        for area, keywords in area_mapping.items():
-            if any(keyword in activity_type for keyword in keywords):
-                return area
-        
-        return "general"
+        return self._area_from_type(activity.get("activity_type", ""))
+    
+    def _area_from_type(self, activity_type: str) -> str:
+        """Map an activity type to its knowledge area (memoized per instance)"""
+        match = self._AREA_REGEX.match(activity_type.lower())
+        return match.lastgroup if match else "general"
     
     def _get_subject_learning_objectives(self, subject: str) -> List[str]:
         """Get learning objectives for a subject"""
-        objectives = {
-            "programming": ["syntax_mastery", "problem_solving", "debugging", "best_practices"],
-            "data_science": ["statistical_analysis", "data_visualization", "modeling", "interpretation"],
-            "mathematics": ["conceptual_understanding", "problem_solving", "application", "proof_techniques"],
-            "language": ["vocabulary", "grammar", "composition", "comprehension"],
-            "design": ["principles", "tools", "user_experience", "accessibility"]
-        }
-        
-        return objectives.get(subject, ["fundamental_concepts", "practical_application"])
+        return list(self._SUBJECT_OBJECTIVES.get(subject, self._DEFAULT_OBJECTIVES))
     
     def _get_initial_gap_assessment(self, learner_id: str) -> Dict[str, any]:
         """Initial gap assessment for new learners"""
@@ -431,10 +645,10 @@ class KnowledgeGapDetector:
 # Global detector instance
 knowledge_gap_detector = KnowledgeGapDetector()
 
-def detect_learning_gaps(learner_id: str) -> Dict[str, any]:
+def detect_learning_gaps(learner_id: str, learner_data: Optional[Dict] = None) -> Dict[str, any]:
     """Main function to detect knowledge gaps"""
     try:
-        return knowledge_gap_detector.detect_knowledge_gaps(learner_id)
+        return knowledge_gap_detector.detect_knowledge_gaps(learner_id, learner_data)
     except Exception as e:
         return {
             "learner_id": learner_id,
@@ -442,6 +656,38 @@ def detect_learning_gaps(learner_id: str) -> Dict[str, any]:
             "timestamp": datetime.now().isoformat()
         }
 
+# Learner records preloaded by the parent process for batch workers
+_worker_learners: Dict[str, Dict] = {}
+
+def _init_gap_worker(learners: Dict[str, Dict]) -> None:
+    """Install the parent's preloaded learner records in a batch worker process"""
+    global _worker_learners
+    _worker_learners = learners
+
+def _detect_preloaded(learner_id: str) -> Dict[str, any]:
+    """Gap detection inside a batch worker, from the preloaded learner record"""
+    return detect_learning_gaps(learner_id, _worker_learners[learner_id])
+
+def detect_learning_gaps_batch(learner_ids: List[str], max_workers: Optional[int] = None) -> Dict[str, Dict]:
+    """Detect knowledge gaps for many learners, fanning large batches out to worker processes
+    
+    Learner records are read once here and handed to the workers, which never touch the store.
+    """
+    learner_ids = list(dict.fromkeys(learner_ids))
+    learners = {learner_id: read_learner(learner_id) for learner_id in learner_ids}
+    results = {learner_id: {"error": "Learner not found"} for learner_id, learner in learners.items() if not learner}
+    found_ids = [learner_id for learner_id in learner_ids if learner_id not in results]
+    
+    if len(found_ids) < PARALLEL_BATCH_MIN_LEARNERS or max_workers == 1:
+        results.update((learner_id, detect_learning_gaps(learner_id, learners[learner_id])) for learner_id in found_ids)
+    else:
+        found_learners = {learner_id: learners[learner_id] for learner_id in found_ids}
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_gap_worker,
+                                 initargs=(found_learners,)) as executor:
+            results.update(zip(found_ids, executor.map(_detect_preloaded, found_ids, chunksize=16)))
+    
+    return {learner_id: results[learner_id] for learner_id in learner_ids}
+
 if __name__ == "__main__":
     # Test the gap detector
     detector = KnowledgeGapDetector()
@@ -453,5 +699,5 @@ if __name__ == "__main__":
         {"activity_type": "python_video", "score": None, "timestamp": "2024-01-17T09:00:00"},  # Passive consumption only
     ]
     
-    gaps = detector._analyze_performance_gaps(sample_activities, [])
+    gaps = detector._analyze_performance_gaps(detector._collect_activity_stats(sample_activities))
     print(f"Detected Gaps: {gaps}")
\ No newline at end of file
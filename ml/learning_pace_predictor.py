@@ -4,15 +4,138 @@ Analyzes learning velocity and predicts future performance
 """
 
 import numpy as np
+import pandas as pd
+import bisect
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime, timedelta
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_absolute_error, mean_squared_error
+from datetime import datetime, timedelta, timezone
+from statistics import fmean
 import joblib
 import os
+from collections import Counter, namedtuple
+from functools import lru_cache
+from pymongo.errors import PyMongoError
 from utils.crud_operations import read_learner, get_engagement_metrics
+from utils.result_cache import ResultCache
+
+# Optional fast codec for saved models (joblib uses lz4 when installed, otherwise zlib)
+try:
+    import lz4
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+# Failures of the learner/engagement store that become error responses (anything else propagates)
+_SOURCE_ERRORS = (PyMongoError, OSError, KeyError)
+
+# Learner records and engagement metrics are reused across pace/prediction calls for this long
+# (writes to the learner through utils.crud_operations drop them sooner)
+SOURCE_CACHE_TTL = 30  # seconds
+SOURCE_CACHE_SIZE = 1024
+
+# joblib compressor for saved models; level 3 trades little speed for a much smaller forest file
+MODEL_COMPRESSION = ("lz4" if LZ4_AVAILABLE else "zlib", 3)
+
+# Batch predictions with at least this many rows let the model use every core
+PARALLEL_PREDICT_MIN_ROWS = 256
+
+# Shortest span a trend half is measured over, so same-day bursts do not divide by ~zero
+MIN_TREND_HALF_WEEKS = 1 / 7  # one day
+
+# Activity-type keywords counted as completions of that kind
+_TYPE_KEYWORDS = ("module", "quiz", "assignment", "test")
+
+# Per-activity columns extracted once per request and shared by every pace/prediction aggregate
+_ActivityArrays = namedtuple("_ActivityArrays", "types scores durations timestamps")
+
+
+# (source, learner_id) -> learner record or engagement metrics
+_source_cache = ResultCache(SOURCE_CACHE_SIZE, ttl=SOURCE_CACHE_TTL, learner_of=lambda key: key[1])
+
+
+def _ttl_cached(source: str, loader, learner_id: str):
+    """``loader(learner_id)``, reused for SOURCE_CACHE_TTL seconds (missing learners are not cached)"""
+    key = (source, learner_id)
+    cached = _source_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    value = loader(learner_id)
+    if value is not None:
+        _source_cache.put(key, value)
+    return value
+
+
+def _cached_read_learner(learner_id: str) -> Optional[Dict]:
+    """read_learner() behind the short-lived source cache"""
+    return _ttl_cached("learner", read_learner, learner_id)
+
+
+def _cached_engagement_metrics(learner_id: str) -> List[Dict]:
+    """get_engagement_metrics() behind the short-lived source cache"""
+    return _ttl_cached("engagements", get_engagement_metrics, learner_id)
+
+
+def cache_clear() -> None:
+    """Drop all cached learner records and engagement metrics"""
+    _source_cache.clear()
+
+
+def _engagement_quality(engagements: List[Dict]) -> float:
+    """Mean engagement completion percentage (0.5 when the learner has no engagements)"""
+    if not engagements:
+        return 0.5
+    return fmean(e.get("metrics", {}).get("completion_percentage", 0) for e in engagements)
+
+
+def _parse_timestamps(activities: List[Dict]) -> pd.DatetimeIndex:
+    """Parse every activity timestamp in one vectorized pass (UTC; NaT when missing or malformed)"""
+    return pd.to_datetime([activity.get("timestamp", "") for activity in activities],
+                          errors="coerce", utc=True, format="ISO8601")
+
+
+def _parse_timestamp(timestamp: str) -> Optional[datetime]:
+    """Parse one ISO-8601 timestamp as a UTC-aware datetime (naive taken as UTC; None when malformed)"""
+    try:
+        parsed = datetime.fromisoformat(timestamp)  # Accepts a trailing "Z" on Python 3.11+
+    except (ValueError, TypeError):
+        return None
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _activity_arrays(activities: List[Dict]) -> _ActivityArrays:
+    """Struct-of-arrays view of activities: lowercased types, scores and durations (NaN when missing
+    or non-numeric) and parsed timestamps"""
+    return _ActivityArrays(
+        types=np.array([str(activity.get("activity_type") or "").lower() for activity in activities], dtype=str),
+        scores=_numeric_field(activities, "score"),
+        durations=_numeric_field(activities, "duration"),
+        timestamps=_parse_timestamps(activities)
+    )
+
+
+def _numeric_field(activities: List[Dict], field: str) -> np.ndarray:
+    """``field`` of every activity as float64, with missing or malformed values as NaN"""
+    values = pd.Series([activity.get(field) for activity in activities], dtype=object)
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+
+
+def _type_keyword_counts(types: np.ndarray) -> Counter:
+    """Activities per type keyword, checking each distinct activity type only once
+    
+    A type containing several keywords (e.g. "module_quiz") counts toward each of them.
+    """
+    keyword_counts = Counter()
+    for activity_type, count in Counter(types.tolist()).items():
+        for keyword in _TYPE_KEYWORDS:
+            if keyword in activity_type:
+                keyword_counts[keyword] += count
+    return keyword_counts
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    """Values that were set and non-zero (the truthy entries of the original activity field)"""
+    return values[(values != 0) & ~np.isnan(values)]
 
 class LearningPaceCalculator:
     """Calculates and analyzes learning pace patterns"""
@@ -25,6 +148,9 @@ class LearningPaceCalculator:
             "fast": {"range": (2.0, 3.5), "description": "2.0-3.5 modules per week"},
             "very_fast": {"range": (3.5, float('inf')), "description": "More than 3.5 modules per week"}
         }
+        # Category names in ascending order and the lower bounds between them, for bisect lookups
+        self._pace_category_names = list(self.pace_categories)
+        self._pace_bounds = [criteria["range"][0] for criteria in self.pace_categories.values()][1:]
         
         self.pace_factors = {
             "session_frequency": 0.3,    # How often learner studies
@@ -36,88 +162,89 @@ class LearningPaceCalculator:
     def calculate_learning_pace(self, learner_id: str, time_window_days: int = 30) -> Dict[str, any]:
         """Calculate detailed learning pace metrics"""
         try:
-            learner_data = read_learner(learner_id)
-            if not learner_data:
-                return {"error": "Learner not found"}
-            
-            activities = learner_data.get("activities", [])
-            if not activities:
-                return self._get_initial_pace_assessment(learner_id)
-            
-            # Filter activities within time window
-            cutoff_date = datetime.now() - timedelta(days=time_window_days)
-            recent_activities = self._filter_activities_by_date(activities, cutoff_date)
-            
-            if not recent_activities:
-                return self._get_insufficient_data_assessment(learner_id, time_window_days)
-            
-            # Calculate pace metrics
-            pace_metrics = self._analyze_pace_metrics(recent_activities, time_window_days)
-            
-            # Calculate pace factors
-            pace_factors = self._analyze_pace_factors(learner_id, recent_activities)
-            
-            # Determine pace category
-            pace_category = self._categorize_pace(pace_metrics["velocity"])
-            
-            # Predict optimal pace
-            optimal_pace = self._calculate_optimal_pace(pace_metrics, pace_factors)
-            
-            return {
-                "learner_id": learner_id,
-                "time_window_days": time_window_days,
-                "pace_metrics": pace_metrics,
-                "pace_factors": pace_factors,
-                "current_pace": {
-                    "category": pace_category["category"],
-                    "velocity": pace_metrics["velocity"],
-                    "description": pace_category["description"]
-                },
-                "optimal_pace": optimal_pace,
-                "pace_analysis": self._analyze_pace_trend(activities),
-                "calculation_timestamp": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
+            learner_data = _cached_read_learner(learner_id)
+            engagements = _cached_engagement_metrics(learner_id) if learner_data else None
+        except _SOURCE_ERRORS as e:
             return {"error": f"Pace calculation failed: {str(e)}"}
+        if not learner_data:
+            return {"error": "Learner not found"}
+        
+        activities = learner_data.get("activities", [])
+        if not activities:
+            return self._get_initial_pace_assessment(learner_id)
+        
+        # Filter activities within time window (fields are extracted once and reused)
+        activity_arrays = _activity_arrays(activities)
+        now = datetime.now()
+        cutoff_date = (now - timedelta(days=time_window_days)).astimezone(timezone.utc)
+        recent_mask = self._recent_activity_mask(activity_arrays.timestamps, cutoff_date)
+        
+        if not recent_mask.any():
+            return self._get_insufficient_data_assessment(learner_id, time_window_days)
+        recent_activities = _ActivityArrays(*(column[recent_mask] for column in activity_arrays))
+        
+        # Calculate pace metrics
+        pace_metrics = self._analyze_pace_metrics(recent_activities, time_window_days)
+        
+        # Calculate pace factors
+        pace_factors = self._analyze_pace_factors(learner_id, recent_activities, engagements)
+        
+        # Determine pace category
+        pace_category = self._categorize_pace(pace_metrics["velocity"])
+        
+        # Predict optimal pace
+        optimal_pace = self._calculate_optimal_pace(pace_metrics, pace_factors)
+        
+        return {
+            "learner_id": learner_id,
+            "time_window_days": time_window_days,
+            "pace_metrics": pace_metrics,
+            "pace_factors": pace_factors,
+            "current_pace": {
+                "category": pace_category["category"],
+                "velocity": pace_metrics["velocity"],
+                "description": pace_category["description"]
+            },
+            "optimal_pace": optimal_pace,
+            "pace_analysis": self._analyze_pace_trend(activity_arrays),
+            "calculation_timestamp": now.isoformat()
+        }
     
     def _filter_activities_by_date(self, activities: List[Dict], cutoff_date: datetime) -> List[Dict]:
         """Filter activities within specified date range"""
-        filtered_activities = []
-        
-        for activity in activities:
-            try:
-                activity_date = datetime.fromisoformat(activity.get("timestamp", "").replace('Z', '+00:00'))
-                if activity_date >= cutoff_date:
-                    filtered_activities.append(activity)
-            except (ValueError, TypeError):
-                continue
-        
-        return filtered_activities
+        recent_mask = self._recent_activity_mask(_parse_timestamps(activities), cutoff_date)
+        return [activity for activity, recent in zip(activities, recent_mask) if recent]
+    
+    def _recent_activity_mask(self, timestamps: pd.DatetimeIndex, cutoff_date: datetime) -> np.ndarray:
+        """Boolean mask of parsed timestamps at or after the cutoff (naive cutoffs are taken as UTC)"""
+        cutoff = pd.Timestamp(cutoff_date)
+        if cutoff.tzinfo is None:
+            cutoff = cutoff.tz_localize("UTC")
+        return np.asarray(timestamps >= cutoff)
     
-    def _analyze_pace_metrics(self, activities: List[Dict], time_window_days: int) -> Dict[str, any]:
+    def _analyze_pace_metrics(self, activities: _ActivityArrays, time_window_days: int) -> Dict[str, any]:
         """Analyze detailed pace metrics"""
         # Count different types of completions
-        module_completions = len([a for a in activities if "module" in a.get("activity_type", "").lower()])
-        quiz_completions = len([a for a in activities if "quiz" in a.get("activity_type", "").lower()])
-        assignment_completions = len([a for a in activities if "assignment" in a.get("activity_type", "").lower()])
-        test_completions = len([a for a in activities if "test" in a.get("activity_type", "").lower()])
+        type_counts = _type_keyword_counts(activities.types)
+        module_completions = type_counts["module"]
+        quiz_completions = type_counts["quiz"]
+        assignment_completions = type_counts["assignment"]
+        test_completions = type_counts["test"]
         
         # Calculate velocities (per week)
+        total_attempts = len(activities.types)
         weeks = time_window_days / 7
-        module_velocity = module_completions / weeks if weeks > 0 else 0
-        total_activity_velocity = len(activities) / weeks if weeks > 0 else 0
+        inv_weeks = 1.0 / weeks if weeks > 0 else 0.0
+        module_velocity = module_completions * inv_weeks
+        total_activity_velocity = total_attempts * inv_weeks
         
-        # Calculate average session duration
-        durations = [a.get("duration", 0) for a in activities if a.get("duration")]
-        avg_session_duration = np.mean(durations) if durations else 0
-        
-        # Calculate total study time
-        total_study_time = sum(durations) if durations else 0
+        # Calculate average session duration and total study time
+        durations = _present(activities.durations)
+        total_study_time = float(durations.sum())
+        avg_session_duration = total_study_time / len(durations) if len(durations) else 0
         
         # Calculate completion rate
-        total_attempts = len(activities)
-        successful_completions = len([a for a in activities if a.get("score", 0) >= 60])
+        successful_completions = int((activities.scores >= 60).sum())
         completion_rate = successful_completions / total_attempts if total_attempts > 0 else 0
         
         return {
@@ -133,32 +260,28 @@ class LearningPaceCalculator:
             "velocity": round(module_velocity, 2)  # Primary velocity metric
         }
     
-    def _analyze_pace_factors(self, learner_id: str, activities: List[Dict]) -> Dict[str, float]:
-        """Analyze factors affecting learning pace"""
+    def _analyze_pace_factors(self, learner_id: str, activities: _ActivityArrays,
+                              engagements: Optional[List[Dict]] = None) -> Dict[str, float]:
+        """Analyze factors affecting learning pace (``engagements`` are fetched when not passed in)"""
         
         # Session frequency factor
-        if len(activities) < 2:
+        activity_count = len(activities.types)
+        if activity_count < 2:
             session_frequency = 0.1
         else:
             # Calculate days between first and last activity
-            timestamps = []
-            for activity in activities:
-                try:
-                    ts = datetime.fromisoformat(activity.get("timestamp", "").replace('Z', '+00:00'))
-                    timestamps.append(ts)
-                except (ValueError, TypeError):
-                    continue
+            timestamps = activities.timestamps.dropna()
             
             if len(timestamps) >= 2:
-                time_span = (max(timestamps) - min(timestamps)).days
-                sessions_per_week = len(activities) / (time_span / 7) if time_span > 0 else 0
+                time_span = (timestamps.max() - timestamps.min()).days
+                sessions_per_week = activity_count / (time_span / 7) if time_span > 0 else 0
                 session_frequency = min(sessions_per_week / 7.0, 1.0)  # Normalize to 0-1
             else:
                 session_frequency = 0.5
         
         # Session duration factor
-        durations = [a.get("duration", 0) for a in activities if a.get("duration")]
-        avg_duration = np.mean(durations) if durations else 0
+        durations = _present(activities.durations)
+        avg_duration = durations.mean() if len(durations) else 0
         # Optimal session duration is 45-90 minutes
         if 45 <= avg_duration <= 90:
             session_duration = 1.0
@@ -168,16 +291,13 @@ class LearningPaceCalculator:
             session_duration = 0.4
         
         # Completion rate factor
-        scores = [a.get("score", 0) for a in activities if a.get("score")]
-        completion_rate = len([s for s in scores if s >= 60]) / len(scores) if scores else 0
+        scores = _present(activities.scores)
+        completion_rate = int((scores >= 60).sum()) / len(scores) if len(scores) else 0
         
         # Engagement quality factor
-        engagements = get_engagement_metrics(learner_id)
-        if engagements:
-            completion_percentages = [e.get("metrics", {}).get("completion_percentage", 0) for e in engagements]
-            engagement_quality = np.mean(completion_percentages) if completion_percentages else 0.5
-        else:
-            engagement_quality = 0.5
+        if engagements is None:
+            engagements = _cached_engagement_metrics(learner_id)
+        engagement_quality = _engagement_quality(engagements)
         
         return {
             "session_frequency": round(session_frequency, 3),
@@ -188,16 +308,10 @@ class LearningPaceCalculator:
     
     def _categorize_pace(self, velocity: float) -> Dict[str, str]:
         """Categorize learning pace"""
-        for category, criteria in self.pace_categories.items():
-            if criteria["range"][0] <= velocity < criteria["range"][1]:
-                return {
-                    "category": category,
-                    "description": criteria["description"]
-                }
-        
+        category = self._pace_category_names[bisect.bisect_right(self._pace_bounds, velocity)]
         return {
-            "category": "very_fast",
-            "description": "More than 3.5 modules per week"
+            "category": category,
+            "description": self.pace_categories[category]["description"]
         }
     
     def _calculate_optimal_pace(self, pace_metrics: Dict, pace_factors: Dict) -> Dict[str, any]:
@@ -253,19 +367,22 @@ class LearningPaceCalculator:
         
         return recommendations
     
-    def _analyze_pace_trend(self, activities: List[Dict]) -> Dict[str, any]:
+    def _analyze_pace_trend(self, activities: _ActivityArrays) -> Dict[str, any]:
         """Analyze pace trends over time"""
-        if len(activities) < 4:
+        timestamps = activities.timestamps.dropna()
+        if len(timestamps) < 4:
             return {"trend": "insufficient_data", "description": "Not enough data for trend analysis"}
         
-        # Split activities into two halves
-        mid_point = len(activities) // 2
-        first_half = activities[:mid_point]
-        second_half = activities[mid_point:]
+        # Split the gaps between activities into two equal halves at the median activity time
+        # (interpolated between the two middle activities when their count is even)
+        elapsed_weeks = np.sort(np.asarray((timestamps - timestamps.min()) / pd.Timedelta(weeks=1)))
+        half_intervals = (len(elapsed_weeks) - 1) / 2
+        mid_week = float(np.interp(half_intervals, np.arange(len(elapsed_weeks)), elapsed_weeks))
         
-        # Calculate velocity for each half (assuming 30-day window)
-        first_velocity = len(first_half) / 0.5  # per week
-        second_velocity = len(second_half) / 0.5  # per week
+        # Calculate velocity for each half (per week) over the time it actually spans; with equal
+        # interval counts on both sides, evenly spaced activity and same-day bursts read as stable
+        first_velocity = half_intervals / max(mid_week, MIN_TREND_HALF_WEEKS)
+        second_velocity = half_intervals / max(float(elapsed_weeks[-1]) - mid_week, MIN_TREND_HALF_WEEKS)
         
         # Determine trend
         velocity_change = second_velocity - first_velocity
@@ -349,8 +466,18 @@ class PerformancePredictionModel:
     """Predicts future learner performance based on historical data"""
     
     def __init__(self):
-        self.model = RandomForestRegressor(n_estimators=100, random_state=42)
+        # sklearn is imported on first construction rather than with the module
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        from sklearn.preprocessing import StandardScaler
+        
+        # Binned gradient boosting: small, fast-to-evaluate trees for a 10-feature tabular target.
+        # Small leaves and no validation holdout below 10k rows keep 20-row training sets splittable.
+        self.model = HistGradientBoostingRegressor(max_iter=200, max_depth=6, learning_rate=0.05,
+                                                   min_samples_leaf=3, early_stopping="auto",
+                                                   random_state=42)
         self.scaler = StandardScaler()
+        # Tree splits are unaffected by standardization; only models loaded from older files need it
+        self.scale_features = False
         self.is_trained = False
         self.feature_names = [
             "historical_avg_score",
@@ -364,210 +491,319 @@ class PerformancePredictionModel:
             "improvement_rate",
             "time_since_last_activity"
         ]
+        # Fitted scaler statistics as plain arrays, so single-row predictions skip transform()
+        self._scaler_mean = None
+        self._scaler_scale = None
     
     def predict_performance(self, learner_id: str, prediction_horizon: int = 7) -> Dict[str, any]:
         """Predict performance for specified number of days ahead"""
         try:
-            learner_data = read_learner(learner_id)
+            learner_data = _cached_read_learner(learner_id)
+            engagements = _cached_engagement_metrics(learner_id) if learner_data else None
+        except _SOURCE_ERRORS as e:
+            return {"error": f"Performance prediction failed: {str(e)}"}
+        if not learner_data:
+            return {"error": "Learner not found"}
+        
+        # Extract features for prediction
+        features = self._extract_prediction_features(learner_data, engagements)
+        if not features:
+            return self._get_default_prediction(learner_id, prediction_horizon)
+        
+        # Make prediction and calculate its confidence
+        prediction, confidence = self._predict_and_confidence(features)
+        
+        return {
+            "learner_id": learner_id,
+            "prediction_horizon_days": prediction_horizon,
+            "predicted_metrics": prediction,
+            "confidence_score": confidence,
+            "features_used": features,
+            "prediction_timestamp": datetime.now().isoformat(),
+            "recommendations": self._generate_prediction_recommendations(prediction, features)
+        }
+    
+    def predict_performance_batch(self, learner_ids: List[str], prediction_horizon: int = 7) -> Dict[str, Dict]:
+        """Predict performance for many learners, scoring all feature rows in one model call"""
+        results = {}
+        batch_features = {}
+        for learner_id in dict.fromkeys(learner_ids):
+            try:
+                learner_data = _cached_read_learner(learner_id)
+                engagements = _cached_engagement_metrics(learner_id) if learner_data else None
+            except _SOURCE_ERRORS as e:
+                results[learner_id] = {"error": f"Performance prediction failed: {str(e)}"}
+                continue
             if not learner_data:
-                return {"error": "Learner not found"}
-            
-            # Extract features for prediction
-            features = self._extract_prediction_features(learner_data)
-            if not features:
-                return self._get_default_prediction(learner_id, prediction_horizon)
+                results[learner_id] = {"error": "Learner not found"}
+                continue
             
-            # Make prediction
-            if self.is_trained:
-                prediction = self._ml_predict(features)
+            features = self._extract_prediction_features(learner_data, engagements)
+            if features:
+                batch_features[learner_id] = features
             else:
-                prediction = self._rule_based_predict(features)
-            
-            # Calculate confidence
-            confidence = self._calculate_prediction_confidence(features)
-            
-            return {
+                results[learner_id] = self._get_default_prediction(learner_id, prediction_horizon)
+        
+        feature_rows = list(batch_features.values())
+        if self.is_trained:
+            predictions = self._ml_predict_batch(feature_rows)
+        else:
+            predictions = [self._rule_based_predict(features) for features in feature_rows]
+        
+        prediction_timestamp = datetime.now().isoformat()
+        for (learner_id, features), prediction in zip(batch_features.items(), predictions):
+            results[learner_id] = {
                 "learner_id": learner_id,
                 "prediction_horizon_days": prediction_horizon,
                 "predicted_metrics": prediction,
-                "confidence_score": confidence,
+                "confidence_score": self._calculate_prediction_confidence(features),
                 "features_used": features,
-                "prediction_timestamp": datetime.nowisoformat(),
+                "prediction_timestamp": prediction_timestamp,
                 "recommendations": self._generate_prediction_recommendations(prediction, features)
             }
-            
-        except Exception as e:
-            return {"error": f"Performance prediction failed: {str(e)}"}
+        
+        return {learner_id: results[learner_id] for learner_id in dict.fromkeys(learner_ids)}
     
-    def _extract_prediction_features(self, learner_data: Dict) -> Optional[Dict[str, float]]:
-        """Extract features for performance prediction"""
-        try:
-            activities = learner_data.get("activities", [])
-            if not activities:
-                return None
-            
-            # Sort activities by timestamp
-            sorted_activities = sorted(activities, key=lambda x: x.get("timestamp", ""))
-            
-            # Historical average score
-            scores = [a.get("score", 0) for a in activities if a.get("score") is not None]
-            historical_avg = np.mean(scores) if scores else 50.0
-            
-            # Recent score trend (last 3 vs previous 3)
-            recent_scores = [a.get("score", 0) for a in sorted_activities[-3:] if a.get("score") is not None]
-            earlier_scores = [a.get("score", 0) for a in sorted_activities[-6:-3] if a.get("score") is not None]
-            
-            if recent_scores and earlier_scores:
-                recent_avg = np.mean(recent_scores)
-                earlier_avg = np.mean(earlier_scores)
-                score_trend = (recent_avg - earlier_avg) / earlier_avg if earlier_avg > 0 else 0
-            else:
-                score_trend = 0.0
-            
-            # Activity frequency (activities per week)
-            if len(sorted_activities) >= 2:
-                time_span = self._calculate_time_span(sorted_activities)
-                activity_frequency = len(activities) / (time_span / 7) if time_span > 0 else 0
-            else:
-                activity_frequency = 1.0
-            
-            # Session duration average
-            durations = [a.get("duration", 0) for a in activities if a.get("duration")]
-            session_duration_avg = np.mean(durations) if durations else 30.0
-            
-            # Completion rate
-            completed_activities = len([a for a in activities if a.get("score", 0) >= 60])
-            completion_rate = completed_activities / len(activities) if activities else 0
-            
-            # Engagement quality
-            engagements = get_engagement_metrics(learner_data.get("id", ""))
-            if engagements:
-                completion_percentages = [e.get("metrics", {}).get("completion_percentage", 0) for e in engagements]
-                engagement_quality = np.mean(completion_percentages) if completion_percentages else 0.5
-            else:
-                engagement_quality = 0.5
-            
-            # Learning velocity (modules per week)
-            module_completions = len([a for a in activities if "module" in a.get("activity_type", "").lower()])
-            if len(sorted_activities) >= 2:
-                time_span_weeks = self._calculate_time_span(sorted_activities) / 7
-                learning_velocity = module_completions / time_span_weeks if time_span_weeks > 0 else 0
-            else:
-                learning_velocity = 0.0
-            
-            # Consistency score (inverse of score variance)
-            if len(scores) > 1:
-                consistency_score = max(0, 1 - (np.std(scores) / 100))  # Normalize variance
-            else:
-                consistency_score = 0.5
-            
-            # Improvement rate
-            if len(scores) >= 4:
-                first_quarter = np.mean(scores[:len(scores)//4])
-                last_quarter = np.mean(scores[-len(scores)//4:])
-                improvement_rate = (last_quarter - first_quarter) / first_quarter if first_quarter > 0 else 0
-            else:
-                improvement_rate = 0.0
-            
-            # Time since last activity
-            if sorted_activities:
-                last_activity = datetime.fromisoformat(sorted_activities[-1].get("timestamp", "").replace('Z', '+00:00'))
-                days_since_last = (datetime.now() - last_activity).days
-            else:
-                days_since_last = 7
-            
-            return {
-                "historical_avg_score": historical_avg,
-                "recent_score_trend": score_trend,
-                "activity_frequency": activity_frequency,
-                "session_duration_avg": session_duration_avg,
-                "completion_rate": completion_rate,
-                "engagement_quality": engagement_quality,
-                "learning_velocity": learning_velocity,
-                "consistency_score": consistency_score,
-                "improvement_rate": improvement_rate,
-                "time_since_last_activity": days_since_last
-            }
-            
-        except Exception as e:
-            print(f"Error extracting prediction features: {e}")
+    def _extract_prediction_features(self, learner_data: Dict,
+                                     engagements: Optional[List[Dict]] = None) -> Optional[Dict[str, float]]:
+        """Extract features for performance prediction (``engagements`` are fetched when not passed in)"""
+        activities = learner_data.get("activities", [])
+        if not activities:
             return None
+        
+        # Chronological order from the parsed timestamps (unparseable ones first); append-only
+        # logs are usually in order already and skip the sort
+        activity_arrays = _activity_arrays(activities)
+        if activity_arrays.timestamps.is_monotonic_increasing:
+            order = np.arange(len(activities))
+        else:
+            order = np.argsort(activity_arrays.timestamps.asi8, kind="stable")
+        sorted_scores = activity_arrays.scores[order]
+        
+        # Historical average score
+        scores = activity_arrays.scores[~np.isnan(activity_arrays.scores)]
+        historical_avg = float(scores.mean()) if len(scores) else 50.0
+        
+        # Recent score trend (last 3 vs previous 3)
+        recent_scores = sorted_scores[-3:][~np.isnan(sorted_scores[-3:])]
+        earlier_scores = sorted_scores[-6:-3][~np.isnan(sorted_scores[-6:-3])]
+        
+        if len(recent_scores) and len(earlier_scores):
+            recent_avg = float(recent_scores.mean())
+            earlier_avg = float(earlier_scores.mean())
+            score_trend = (recent_avg - earlier_avg) / earlier_avg if earlier_avg > 0 else 0
+        else:
+            score_trend = 0.0
+        
+        # Activity span (as reciprocal weeks), computed once for frequency and velocity
+        inv_weeks_span = 0.0
+        if len(activities) >= 2:
+            time_span_days = self._calculate_time_span(activities, activity_arrays.timestamps)
+            if time_span_days > 0:
+                inv_weeks_span = 7.0 / time_span_days
+        
+        # Activity frequency (activities per week)
+        if len(activities) >= 2:
+            activity_frequency = len(activities) * inv_weeks_span
+        else:
+            activity_frequency = 1.0
+        
+        # Session duration average
+        durations = _present(activity_arrays.durations)
+        session_duration_avg = float(durations.mean()) if len(durations) else 30.0
+        
+        # Completion rate
+        completed_activities = int((activity_arrays.scores >= 60).sum())
+        completion_rate = completed_activities / len(activities) if activities else 0
+        
+        # Engagement quality
+        if engagements is None:
+            engagements = _cached_engagement_metrics(learner_data.get("id", ""))
+        engagement_quality = _engagement_quality(engagements)
+        
+        # Learning velocity (modules per week)
+        module_completions = _type_keyword_counts(activity_arrays.types)["module"]
+        if len(activities) >= 2:
+            learning_velocity = module_completions * inv_weeks_span
+        else:
+            learning_velocity = 0.0
+        
+        # Consistency score (inverse of score variance)
+        if len(scores) > 1:
+            consistency_score = max(0, 1 - (float(scores.std()) / 100))  # Normalize variance
+        else:
+            consistency_score = 0.5
+        
+        # Improvement rate
+        if len(scores) >= 4:
+            first_quarter = float(scores[:len(scores)//4].mean())
+            last_quarter = float(scores[-len(scores)//4:].mean())
+            improvement_rate = (last_quarter - first_quarter) / first_quarter if first_quarter > 0 else 0
+        else:
+            improvement_rate = 0.0
+        
+        # Time since last activity
+        last_activity = _parse_timestamp(activities[order[-1]].get("timestamp", ""))
+        if last_activity is not None:
+            days_since_last = (datetime.now(timezone.utc) - last_activity).days
+        else:
+            days_since_last = 7
+        
+        return {
+            "historical_avg_score": historical_avg,
+            "recent_score_trend": score_trend,
+            "activity_frequency": activity_frequency,
+            "session_duration_avg": session_duration_avg,
+            "completion_rate": completion_rate,
+            "engagement_quality": engagement_quality,
+            "learning_velocity": learning_velocity,
+            "consistency_score": consistency_score,
+            "improvement_rate": improvement_rate,
+            "time_since_last_activity": days_since_last
+        }
     
-    def _calculate_time_span(self, activities: List[Dict]) -> float:
+    def _calculate_time_span(self, activities: List[Dict], timestamps: Optional[pd.DatetimeIndex] = None) -> float:
         """Calculate time span between first and last activity in days"""
-        try:
-            timestamps = [datetime.fromisoformat(a.get("timestamp", "").replace('Z', '+00:00')) for a in activities]
-            return (max(timestamps) - min(timestamps)).days
-        except (ValueError, TypeError):
+        if timestamps is None:
+            timestamps = _parse_timestamps(activities)
+        if timestamps.hasnans:
             return 7.0  # Default to 1 week
+        return (timestamps.max() - timestamps.min()).days
     
     def _ml_predict(self, features: Dict[str, float]) -> Dict[str, float]:
         """Make prediction using trained ML model"""
         try:
-            feature_vector = np.array([[features[name] for name in self.feature_names]])
-            feature_vector_scaled = self.scaler.transform(feature_vector)
+            feature_vector = np.fromiter((features[name] for name in self.feature_names),
+                                         dtype=np.float64, count=len(self.feature_names))
             
-            prediction = self.model.predict(feature_vector_scaled)[0]
+            return self._predicted_metrics(self.model.predict(self._model_input(feature_vector.reshape(1, -1)))[0])
             
-            # Ensure prediction is within reasonable bounds
-            prediction = max(0, min(100, prediction))
+        except Exception as e:
+            print(f"ML prediction error: {e}")
+            return self._rule_based_predict(features)
+    
+    def _ml_predict_batch(self, feature_rows: List[Dict[str, float]]) -> List[Dict[str, float]]:
+        """_ml_predict for many feature dicts with one (N, n_features) model call"""
+        if not feature_rows:
+            return []
+        try:
+            feature_matrix = np.array([[features[name] for name in self.feature_names] for features in feature_rows],
+                                      dtype=np.float64)
             
-            return {
-                "predicted_avg_score": round(prediction, 2),
-                "predicted_completion_rate": round(max(0, min(1, prediction / 100 + 0.1)), 3),
-                "predicted_activity_count": round(max(1, prediction / 10), 0)
-            }
+            # Small batches stay single-threaded for joblib-parallel models (start-up outweighs the tree walks)
+            n_jobs = -1 if len(feature_rows) >= PARALLEL_PREDICT_MIN_ROWS else 1
+            with joblib.parallel_config(n_jobs=n_jobs):
+                predictions = self.model.predict(self._model_input(feature_matrix))
+            
+            return [self._predicted_metrics(prediction) for prediction in predictions]
             
         except Exception as e:
             print(f"ML prediction error: {e}")
-            return self._rule_based_predict(features)
+            return [self._rule_based_predict(features) for features in feature_rows]
+    
+    def _predicted_metrics(self, prediction: float) -> Dict[str, float]:
+        """Predicted metrics from a raw model score"""
+        # Ensure prediction is within reasonable bounds
+        prediction = max(0, min(100, prediction))
+        
+        return {
+            "predicted_avg_score": round(prediction, 2),
+            "predicted_completion_rate": round(max(0, min(1, prediction / 100 + 0.1)), 3),
+            "predicted_activity_count": round(max(1, prediction / 10), 0)
+        }
+    
+    def _model_input(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Feature rows as the model expects them (standardized only for models trained on scaled input)"""
+        if not self.scale_features:
+            return feature_matrix
+        if self._scaler_mean is None:
+            self._cache_scaler_params()
+        return (feature_matrix - self._scaler_mean) / self._scaler_scale
+    
+    def _cache_scaler_params(self):
+        """Keep the fitted scaler's mean/scale as float64 arrays (same result as scaler.transform)"""
+        self._scaler_mean = np.asarray(self.scaler.mean_, dtype=np.float64)
+        self._scaler_scale = np.asarray(self.scaler.scale_, dtype=np.float64)
+    
+    def _predict_and_confidence(self, features: Dict[str, float]) -> Tuple[Dict[str, float], float]:
+        """Predicted metrics (ML model when trained, rules otherwise) and their confidence,
+        reading each feature once"""
+        activity_frequency = features.get("activity_frequency", 1)
+        consistency = features.get("consistency_score", 0.5)
+        
+        if self.is_trained:
+            prediction = self._ml_predict(features)
+        else:
+            prediction = self._rule_based_metrics(
+                features.get("historical_avg_score", 50.0), features.get("recent_score_trend", 0),
+                activity_frequency, consistency,
+                features.get("engagement_quality", 0.5), features.get("completion_rate", 0.5)
+            )
+        
+        # A missing frequency adds no confidence whether read as 0 or 1
+        confidence = self._prediction_confidence(activity_frequency, consistency,
+                                                 features.get("time_since_last_activity", 0))
+        return prediction, confidence
     
     def _rule_based_predict(self, features: Dict[str, float]) -> Dict[str, float]:
         """Rule-based prediction when ML model is not available"""
+        return self._rule_based_metrics(
+            features.get("historical_avg_score", 50.0), features.get("recent_score_trend", 0),
+            features.get("activity_frequency", 1), features.get("consistency_score", 0.5),
+            features.get("engagement_quality", 0.5), features.get("completion_rate", 0.5)
+        )
+    
+    def _rule_based_metrics(self, historical_avg_score: float, recent_score_trend: float,
+                            activity_frequency: float, consistency_score: float,
+                            engagement_quality: float, completion_rate: float) -> Dict[str, float]:
+        """Rule-based predicted metrics from the individual feature values"""
         # Base prediction on historical average
-        base_score = features.get("historical_avg_score", 50.0)
+        base_score = historical_avg_score
         
         # Adjust based on trends
-        score_adjustment = features.get("recent_score_trend", 0) * 20  # Scale trend impact
-        activity_adjustment = min(features.get("activity_frequency", 1) / 7.0, 1.0) * 5  # Bonus for regular activity
+        score_adjustment = recent_score_trend * 20  # Scale trend impact
+        activity_adjustment = min(activity_frequency / 7.0, 1.0) * 5  # Bonus for regular activity
         
         predicted_score = base_score + score_adjustment + activity_adjustment
         predicted_score = max(0, min(100, predicted_score))
         
         # Predict completion rate based on consistency and engagement
-        completion_rate = (
-            features.get("consistency_score", 0.5) * 0.4 +
-            features.get("engagement_quality", 0.5) * 0.3 +
-            features.get("completion_rate", 0.5) * 0.3
+        predicted_completion_rate = (
+            consistency_score * 0.4 +
+            engagement_quality * 0.3 +
+            completion_rate * 0.3
         )
         
         # Predict activity count based on frequency and velocity
-        activity_count = max(1, int(features.get("activity_frequency", 1) * 7))
+        activity_count = max(1, int(activity_frequency * 7))
         
         return {
             "predicted_avg_score": round(predicted_score, 2),
-            "predicted_completion_rate": round(completion_rate, 3),
+            "predicted_completion_rate": round(predicted_completion_rate, 3),
             "predicted_activity_count": activity_count
         }
     
     def _calculate_prediction_confidence(self, features: Dict[str, float]) -> float:
         """Calculate confidence in the prediction"""
+        return self._prediction_confidence(features.get("activity_frequency", 0),
+                                           features.get("consistency_score", 0.5),
+                                           features.get("time_since_last_activity", 0))
+    
+    def _prediction_confidence(self, activity_frequency: float, consistency: float, days_since_last: float) -> float:
+        """Prediction confidence from activity frequency, score consistency and staleness"""
         # Base confidence on data availability
         base_confidence = 0.5
         
         # Increase confidence with more data
-        activity_frequency = features.get("activity_frequency", 0)
         if activity_frequency > 3:  # More than 3 activities per week
             base_confidence += 0.2
         elif activity_frequency > 1:  # More than 1 activity per week
             base_confidence += 0.1
         
         # Increase confidence with consistency
-        consistency = features.get("consistency_score", 0.5)
         base_confidence += consistency * 0.2
         
         # Decrease confidence for stale data
-        days_since_last = features.get("time_since_last_activity", 0)
         if days_since_last > 14:  # More than 2 weeks since last activity
             base_confidence -= 0.2
         
@@ -639,11 +875,17 @@ class PerformancePredictionModel:
             y = np.array(y)
             
             # Split data
+            from sklearn.model_selection import train_test_split
+            from sklearn.metrics import mean_absolute_error
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            # Scale features (only for models that need standardized input)
+            if self.scale_features:
+                X_train_scaled = self.scaler.fit_transform(X_train)
+                self._cache_scaler_params()
+                X_test_scaled = self.scaler.transform(X_test)
+            else:
+                X_train_scaled, X_test_scaled = X_train, X_test
             
             # Train model
             self.model.fit(X_train_scaled, y_train)
@@ -668,11 +910,12 @@ class PerformancePredictionModel:
             model_data = {
                 'model': self.model,
                 'scaler': self.scaler,
+                'scale_features': self.scale_features,
                 'is_trained': self.is_trained,
                 'feature_names': self.feature_names
             }
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            joblib.dump(model_data, filepath)
+            joblib.dump(model_data, filepath, compress=MODEL_COMPRESSION)
             print(f"Performance Prediction Model saved to {filepath}")
         except Exception as e:
             print(f"Error saving model: {e}")
@@ -684,8 +927,11 @@ class PerformancePredictionModel:
                 model_data = joblib.load(filepath)
                 self.model = model_data['model']
                 self.scaler = model_data['scaler']
+                # Files saved before the switch to gradient boosting hold a forest trained on scaled input
+                self.scale_features = model_data.get('scale_features', True)
                 self.is_trained = model_data['is_trained']
                 self.feature_names = model_data['feature_names']
+                self._scaler_mean = self._scaler_scale = None
                 print(f"Performance Prediction Model loaded from {filepath}")
             else:
                 print("Model file not found. Using rule-based prediction.")
@@ -693,17 +939,36 @@ class PerformancePredictionModel:
             print(f"Error loading model: {e}")
 
 
-# Global instances
-learning_pace_calculator = LearningPaceCalculator()
-performance_prediction_model = PerformancePredictionModel()
+# Global instances, built on first use so importing the module stays cheap
+@lru_cache(maxsize=1)
+def get_learning_pace_calculator() -> LearningPaceCalculator:
+    """Shared LearningPaceCalculator used by the module-level functions"""
+    return LearningPaceCalculator()
+
+@lru_cache(maxsize=1)
+def get_performance_prediction_model() -> PerformancePredictionModel:
+    """Shared PerformancePredictionModel used by the module-level functions"""
+    return PerformancePredictionModel()
+
+def __getattr__(name: str):
+    """Keep ``learning_pace_calculator``/``performance_prediction_model`` importable as module attributes"""
+    if name == "learning_pace_calculator":
+        return get_learning_pace_calculator()
+    if name == "performance_prediction_model":
+        return get_performance_prediction_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def calculate_learning_pace(learner_id: str, time_window_days: int = 30) -> Dict[str, any]:
     """Main function to calculate learning pace"""
-    return learning_pace_calculator.calculate_learning_pace(learner_id, time_window_days)
+    return get_learning_pace_calculator().calculate_learning_pace(learner_id, time_window_days)
 
 def predict_performance(learner_id: str, prediction_horizon: int = 7) -> Dict[str, any]:
     """Main function to predict performance"""
-    return performance_prediction_model.predict_performance(learner_id, prediction_horizon)
+    return get_performance_prediction_model().predict_performance(learner_id, prediction_horizon)
+
+def predict_performance_batch(learner_ids: List[str], prediction_horizon: int = 7) -> Dict[str, Dict]:
+    """Main function to predict performance for many learners at once"""
+    return get_performance_prediction_model().predict_performance_batch(learner_ids, prediction_horizon)
 
 if __name__ == "__main__":
     # Test the systems
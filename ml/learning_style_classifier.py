@@ -5,190 +5,348 @@ Uses behavioral patterns and engagement data to classify learning preferences
 
 import numpy as np
 from typing import Dict, List, Tuple, Optional
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
 import joblib
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
+from statistics import fmean
 from utils.crud_operations import read_learner, get_engagement_metrics
+from utils.result_cache import ResultCache
+
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Optional JIT for the rule-based style scores (falls back to plain Python)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Optional fast codec for saved models (joblib uses lz4 when installed, otherwise zlib)
+try:
+    import lz4
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+# Activity-type keywords for each behavioural bucket (matched as substrings of the lowercased type)
+VIDEO_KEYWORDS = ("video",)
+READING_KEYWORDS = ("reading", "article", "text")
+PROJECT_KEYWORDS = ("project",)
+HANDS_ON_KEYWORDS = ("interactive", "assignment")
+INTERACTIVE_KEYWORDS = HANDS_ON_KEYWORDS + PROJECT_KEYWORDS
+DISCUSSION_KEYWORDS = ("discussion",)
+
+# joblib compressor for saved models; level 3 trades little speed for a much smaller forest file
+MODEL_COMPRESSION = ("lz4" if LZ4_AVAILABLE else "zlib", 3)
+
+# Scaled feature matrices are single precision: the forest compares float32 thresholds anyway and
+# the ONNX graph takes float32 input (the scaler itself is fitted and applied in float64)
+FEATURE_DTYPE = np.float32
+
+# Threads that fetch engagement metrics while the calling thread reads the learner record
+FETCH_WORKERS = 8
+
+# Batch classifications with at least this many rows let the forest use every core
+PARALLEL_PREDICT_MIN_ROWS = 256
+
+# Column order of a feature vector (and of the classifier's training matrix)
+FEATURE_NAMES = (
+    "video_completion_rate",
+    "audio_content_preference",
+    "hands_on_activity_rate",
+    "reading_completion_rate",
+    "interactive_content_engagement",
+    "visual_content_time_spent",
+    "discussion_participation",
+    "project_completion_rate",
+    "quiz_performance_on_interactive",
+    "average_session_length",
+    "content_revisit_rate"
+)
+(IDX_VIDEO_COMPLETION, IDX_AUDIO_PREFERENCE, IDX_HANDS_ON, IDX_READING_COMPLETION, IDX_INTERACTIVE_ENGAGEMENT,
+ IDX_VISUAL_TIME, IDX_DISCUSSION, IDX_PROJECT_COMPLETION, IDX_INTERACTIVE_QUIZ, IDX_SESSION_LENGTH,
+ IDX_REVISIT_RATE) = range(len(FEATURE_NAMES))
+
+# Feature vector assumed for learners without any activity history
+DEFAULT_FEATURE_VECTOR = np.array([0.25, 0.25, 0.25, 0.25, 0.5, 0.5, 0.2, 0.3, 0.6, 30.0, 0.3])
+DEFAULT_FEATURE_VECTOR.flags.writeable = False
+
+# Styles scored by the rule-based fallback, in tie-breaking order (index returned by _rule_scores)
+RULE_STYLES = ("Visual", "Auditory", "Kinesthetic", "Reading/Writing")
+
+# classify_learner_style results are reused for this long; writes to the learner's record or
+# engagements drop them, and retraining/reloading the model clears them all
+STYLE_CACHE_TTL = 60  # seconds
+STYLE_CACHE_SIZE = 1024
+
+
+def _keyword_mask(types: np.ndarray, keywords: Tuple[str, ...]) -> np.ndarray:
+    """Boolean mask of the activity types containing any of ``keywords``"""
+    mask = np.char.find(types, keywords[0]) >= 0
+    for keyword in keywords[1:]:
+        mask |= np.char.find(types, keyword) >= 0
+    return mask
+
+
+def _numeric_column(activities: List[Dict], field: str) -> np.ndarray:
+    """``field`` of every activity as float64, with missing/None values as 0"""
+    return np.fromiter((a.get(field) or 0 for a in activities), dtype=np.float64, count=len(activities))
+
+
+@njit(cache=True)
+def _rule_scores(features):
+    """Index into RULE_STYLES of the best-scoring style and its score (first style wins ties)"""
+    visual_score = features[IDX_VIDEO_COMPLETION] * 0.4 + features[IDX_VISUAL_TIME] * 0.3
+    auditory_score = features[IDX_DISCUSSION] * 0.5 + features[IDX_AUDIO_PREFERENCE] * 0.3
+    kinesthetic_score = features[IDX_HANDS_ON] * 0.4 + features[IDX_PROJECT_COMPLETION] * 0.3
+    reading_score = features[IDX_READING_COMPLETION] * 0.5
+    
+    best, best_score = 0, visual_score
+    if auditory_score > best_score:
+        best, best_score = 1, auditory_score
+    if kinesthetic_score > best_score:
+        best, best_score = 2, kinesthetic_score
+    if reading_score > best_score:
+        best, best_score = 3, reading_score
+    return best, best_score
+
+
+@lru_cache(maxsize=1)
+def _fetch_executor() -> ThreadPoolExecutor:
+    """Thread pool for the engagement reads, created on first use"""
+    return ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="style-fetch")
+
+
+_style_cache = ResultCache(STYLE_CACHE_SIZE, ttl=STYLE_CACHE_TTL)
+
+
+def cache_clear() -> None:
+    """Drop all cached learner style classifications"""
+    _style_cache.clear()
+
 
 class LearningStyleClassifier:
     """ML model to classify learning styles based on behavioral patterns"""
     
     def __init__(self):
+        # sklearn is imported on first construction rather than with the module
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.preprocessing import StandardScaler
+        
         self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
         self.is_trained = False
+        self._onnx_session = None  # scaler + forest compiled to ONNX, when onnxruntime is installed
+        self._scaler_mean = None
+        self._scaler_inv_scale = None
         self.style_mapping = {
             0: "Visual",
             1: "Auditory", 
             2: "Kinesthetic",
             3: "Reading/Writing"
         }
-        self.feature_names = [
-            "video_completion_rate",
-            "audio_content_preference", 
-            "hands_on_activity_rate",
-            "reading_completion_rate",
-            "interactive_content_engagement",
-            "visual_content_time_spent",
-            "discussion_participation",
-            "project_completion_rate",
-            "quiz_performance_on_interactive",
-            "average_session_length",
-            "content_revisit_rate"
-        ]
+        self._style_to_idx = {style: idx for idx, style in self.style_mapping.items()}
+        self.feature_names = list(FEATURE_NAMES)
         
     def extract_learning_features(self, learner_id: str) -> Optional[Dict[str, float]]:
         """Extract behavioral features from learner data for classification"""
+        features = self._extract_feature_vector(learner_id)
+        return None if features is None else self._feature_dict(features)
+    
+    def _feature_dict(self, features: np.ndarray) -> Dict[str, float]:
+        """Named view of a feature vector"""
+        return dict(zip(FEATURE_NAMES, features.tolist()))
+    
+    def _extract_feature_vector(self, learner_id: str) -> Optional[np.ndarray]:
+        """extract_learning_features as a vector in FEATURE_NAMES order"""
         try:
+            # Both reads are I/O-bound, so the engagement query runs alongside the learner lookup
+            engagements_future = _fetch_executor().submit(get_engagement_metrics, learner_id)
             learner = read_learner(learner_id)
             if not learner:
+                engagements_future.cancel()
                 return None
                 
             activities = learner.get("activities", [])
-            engagements = get_engagement_metrics(learner_id)
+            engagements = engagements_future.result()
             
             if not activities and not engagements:
-                return self._get_default_features()
+                return DEFAULT_FEATURE_VECTOR.copy()
             
             # Initialize feature counters
-            features = {
-                "video_completion_rate": 0.0,
-                "audio_content_preference": 0.0,
-                "hands_on_activity_rate": 0.0,
-                "reading_completion_rate": 0.0,
-                "interactive_content_engagement": 0.0,
-                "visual_content_time_spent": 0.0,
-                "discussion_participation": 0.0,
-                "project_completion_rate": 0.0,
-                "quiz_performance_on_interactive": 0.0,
-                "average_session_length": 0.0,
-                "content_revisit_rate": 0.0
-            }
+            features = np.zeros(len(FEATURE_NAMES))
             
             # Analyze activities
             total_activities = len(activities)
             if total_activities == 0:
-                return self._get_default_features()
+                return DEFAULT_FEATURE_VECTOR.copy()
             
-            video_activities = [a for a in activities if "video" in a.get("activity_type", "").lower()]
-            reading_activities = [a for a in activities if any(keyword in a.get("activity_type", "").lower() 
-                              for keyword in ["reading", "article", "text"])]
-            interactive_activities = [a for a in activities if any(keyword in a.get("activity_type", "").lower() 
-                                   for keyword in ["interactive", "project", "assignment"])]
-            discussion_activities = [a for a in activities if "discussion" in a.get("activity_type", "").lower()]
+            # Lowercase each activity type once and bucket them with vectorized keyword masks
+            types = np.array([(a.get("activity_type") or "").lower() for a in activities], dtype=str)
+            is_video = _keyword_mask(types, VIDEO_KEYWORDS)
+            is_reading = _keyword_mask(types, READING_KEYWORDS)
+            # Projects are one of the interactive buckets, so that mask is searched once and reused
+            is_project = _keyword_mask(types, PROJECT_KEYWORDS)
+            is_interactive = _keyword_mask(types, HANDS_ON_KEYWORDS) | is_project
+            is_discussion = _keyword_mask(types, DISCUSSION_KEYWORDS)
             
             # Calculate feature rates
-            features["video_completion_rate"] = len(video_activities) / total_activities
-            features["reading_completion_rate"] = len(reading_activities) / total_activities
-            features["hands_on_activity_rate"] = len(interactive_activities) / total_activities
-            features["discussion_participation"] = len(discussion_activities) / total_activities
+            features[IDX_VIDEO_COMPLETION] = int(is_video.sum()) / total_activities
+            features[IDX_READING_COMPLETION] = int(is_reading.sum()) / total_activities
+            features[IDX_HANDS_ON] = int(is_interactive.sum()) / total_activities
+            features[IDX_DISCUSSION] = int(is_discussion.sum()) / total_activities
             
             # Calculate average session length
-            durations = [a.get("duration", 0) for a in activities if a.get("duration")]
-            features["average_session_length"] = np.mean(durations) if durations else 0.0
+            durations = _numeric_column(activities, "duration")
+            durations = durations[durations != 0]
+            features[IDX_SESSION_LENGTH] = float(durations.mean()) if len(durations) else 0.0
             
             # Analyze engagement patterns
             if engagements:
-                completion_rates = []
-                for engagement in engagements[-10:]:  # Last 10 engagements
-                    metrics = engagement.get("metrics", {})
-                    completion_rates.append(metrics.get("completion_percentage", 0.0))
-                
-                features["interactive_content_engagement"] = np.mean(completion_rates) if completion_rates else 0.0
+                # Completion over the last 10 engagements (the only pass over the full list is the revisit count)
+                features[IDX_INTERACTIVE_ENGAGEMENT] = fmean(
+                    engagement.get("metrics", {}).get("completion_percentage", 0.0) for engagement in engagements[-10:])
                 
                 # Calculate revisit rate (engagements with same content)
-                content_interactions = {}
-                for engagement in engagements:
-                    content_id = engagement.get("engagement_id", "")
-                    content_interactions[content_id] = content_interactions.get(content_id, 0) + 1
-                
-                revisited_content = sum(1 for count in content_interactions.values() if count > 1)
-                features["content_revisit_rate"] = revisited_content / len(content_interactions) if content_interactions else 0.0
+                content_interactions = Counter(engagement.get("engagement_id", "") for engagement in engagements)
+                revisited_content = sum(count > 1 for count in content_interactions.values())
+                features[IDX_REVISIT_RATE] = revisited_content / len(content_interactions) if content_interactions else 0.0
             
             # Calculate performance-based features
-            scores = [a.get("score", 0) for a in activities if a.get("score")]
-            if scores:
-                avg_score = np.mean(scores)
+            all_scores = _numeric_column(activities, "score")
+            scored = all_scores != 0
+            if scored.any():
+                avg_score = float(all_scores[scored].mean())
                 # Visual learners tend to perform well on video content
-                video_scores = [a.get("score", 0) for a in video_activities if a.get("score")]
-                features["visual_content_time_spent"] = np.mean(video_scores) / 100.0 if video_scores else avg_score / 100.0
+                video_scores = all_scores[scored & is_video]
+                features[IDX_VISUAL_TIME] = float(video_scores.mean()) / 100.0 if len(video_scores) else avg_score / 100.0
                 
                 # Interactive learners perform well on hands-on activities
-                interactive_scores = [a.get("score", 0) for a in interactive_activities if a.get("score")]
-                features["quiz_performance_on_interactive"] = np.mean(interactive_scores) / 100.0 if interactive_scores else avg_score / 100.0
+                interactive_scores = all_scores[scored & is_interactive]
+                features[IDX_INTERACTIVE_QUIZ] = float(interactive_scores.mean()) / 100.0 if len(interactive_scores) else avg_score / 100.0
                 
                 # Project completion rate
-                project_activities = [a for a in activities if "project" in a.get("activity_type", "").lower()]
-                features["project_completion_rate"] = len(project_activities) / total_activities
+                features[IDX_PROJECT_COMPLETION] = float(is_project.mean())
             
             return features
             
         except Exception as e:
             print(f"Error extracting learning features: {e}")
-            return self._get_default_features()
+            return DEFAULT_FEATURE_VECTOR.copy()
     
     def _get_default_features(self) -> Dict[str, float]:
         """Return default features for new learners"""
-        return {
-            "video_completion_rate": 0.25,
-            "audio_content_preference": 0.25,
-            "hands_on_activity_rate": 0.25,
-            "reading_completion_rate": 0.25,
-            "interactive_content_engagement": 0.5,
-            "visual_content_time_spent": 0.5,
-            "discussion_participation": 0.2,
-            "project_completion_rate": 0.3,
-            "quiz_performance_on_interactive": 0.6,
-            "average_session_length": 30.0,
-            "content_revisit_rate": 0.3
-        }
+        return self._feature_dict(DEFAULT_FEATURE_VECTOR)
+    
+    def classify_learning_style(self, learner_id: str,
+                                features: Optional[Dict[str, float]] = None) -> Tuple[str, float]:
+        """Classify learner's learning style with confidence score (``features`` are extracted when not passed in)"""
+        if features is None:
+            return self._classify_features(self._extract_feature_vector(learner_id))
+        return self._classify_features(np.array([features[name] for name in FEATURE_NAMES]))
+    
+    def classify_batch(self, learner_ids: List[str]) -> Dict[str, Tuple[str, float]]:
+        """Classify many learners, scoring all feature rows with one model call"""
+        learner_ids = list(dict.fromkeys(learner_ids))
+        feature_rows = [self._extract_feature_vector(learner_id) for learner_id in learner_ids]
+        return dict(zip(learner_ids, self._classify_feature_rows(feature_rows)))
     
-    def classify_learning_style(self, learner_id: str) -> Tuple[str, float]:
-        """Classify learner's learning style with confidence score"""
+    def _classify_features(self, features: Optional[np.ndarray]) -> Tuple[str, float]:
+        """Classify an already extracted feature vector"""
+        return self._classify_feature_rows([features])[0]
+    
+    def _classify_feature_rows(self, feature_rows: List[Optional[np.ndarray]]) -> List[Tuple[str, float]]:
+        """Classify many feature vectors (missing ones are "Mixed"); the trained model sees one (N, F) matrix"""
+        results = [("Mixed", 0.5)] * len(feature_rows)
+        rows = [i for i, features in enumerate(feature_rows) if features is not None]
+        
+        if not self.is_trained:
+            # Use rule-based classification if model not trained
+            for i in rows:
+                try:
+                    results[i] = self._rule_based_classification(feature_rows[i])
+                except Exception as e:
+                    print(f"Error in learning style classification: {e}")
+            return results
+        
+        if not rows:
+            return results
+        
+        # Use trained ML model
         try:
-            features = self.extract_learning_features(learner_id)
-            if not features:
-                return "Mixed", 0.5
-            
-            if not self.is_trained:
-                # Use rule-based classification if model not trained
-                return self._rule_based_classification(features)
-            
-            # Use trained ML model
-            feature_vector = np.array([[features[name] for name in self.feature_names]])
-            feature_vector_scaled = self.scaler.transform(feature_vector)
-            
-            prediction = self.classifier.predict(feature_vector_scaled)[0]
-            probabilities = self.classifier.predict_proba(feature_vector_scaled)[0]
-            confidence = np.max(probabilities)
-            
-            return self.style_mapping[prediction], confidence
-            
+            feature_matrix = np.array([feature_rows[i] for i in rows], dtype=np.float64)
+            if self.feature_names != list(FEATURE_NAMES):
+                # Model saved with another column order
+                feature_matrix = feature_matrix[:, [FEATURE_NAMES.index(name) for name in self.feature_names]]
+            probabilities = self._predict_probabilities(feature_matrix)
         except Exception as e:
             print(f"Error in learning style classification: {e}")
-            return "Mixed", 0.5
+            return results
+        
+        # predict() is the most probable class, so one predict_proba call yields style and confidence
+        best = probabilities.argmax(axis=1)
+        for i, best_idx, row_probabilities in zip(rows, best, probabilities):
+            results[i] = self.style_mapping[self.classifier.classes_[best_idx]], float(row_probabilities[best_idx])
+        return results
     
-    def _rule_based_classification(self, features: Dict[str, float]) -> Tuple[str, float]:
-        """Rule-based classification as fallback"""
-        visual_score = features["video_completion_rate"] * 0.4 + features["visual_content_time_spent"] * 0.3
-        auditory_score = features["discussion_participation"] * 0.5 + features["audio_content_preference"] * 0.3
-        kinesthetic_score = features["hands_on_activity_rate"] * 0.4 + features["project_completion_rate"] * 0.3
-        reading_score = features["reading_completion_rate"] * 0.5
+    def _predict_probabilities(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """Class probabilities (columns follow classifier.classes_) for unscaled feature rows"""
+        if self._onnx_session is not None:
+            # The ONNX graph includes the scaler, so scaling and the tree walks both run natively
+            _, probabilities = self._onnx_session.run(None, {"X": feature_matrix.astype(FEATURE_DTYPE, copy=False)})
+            return probabilities
         
-        scores = {
-            "Visual": visual_score,
-            "Auditory": auditory_score, 
-            "Kinesthetic": kinesthetic_score,
-            "Reading/Writing": reading_score
-        }
+        if self._scaler_mean is None:
+            self._cache_scaler_params()
+        feature_matrix_scaled = ((feature_matrix - self._scaler_mean) * self._scaler_inv_scale).astype(FEATURE_DTYPE)
         
-        best_style = max(scores, key=scores.get)
-        confidence = scores[best_style]
+        # Small batches stay single-threaded (joblib start-up outweighs the tree walks)
+        n_jobs = -1 if len(feature_matrix) >= PARALLEL_PREDICT_MIN_ROWS else 1
+        with joblib.parallel_config(n_jobs=n_jobs):
+            return self.classifier.predict_proba(feature_matrix_scaled)
+    
+    def _cache_scaler_params(self):
+        """Keep the fitted scaler as a float64 affine map (skips transform()'s per-call validation)"""
+        self._scaler_mean = np.asarray(self.scaler.mean_, dtype=np.float64)
+        self._scaler_inv_scale = 1.0 / np.asarray(self.scaler.scale_, dtype=np.float64)
+    
+    def _export_onnx(self) -> Optional[bytes]:
+        """Serialized ONNX graph of the fitted scaler + forest, or None when skl2onnx is unavailable"""
+        if not (ONNX_AVAILABLE and self.is_trained):
+            return None
+        from sklearn.pipeline import make_pipeline
         
-        return best_style, min(confidence, 1.0)
+        pipeline = make_pipeline(self.scaler, self.classifier)
+        onnx_model = convert_sklearn(pipeline,
+                                     initial_types=[("X", FloatTensorType([None, len(self.feature_names)]))],
+                                     options={id(self.classifier): {"zipmap": False}})
+        return onnx_model.SerializeToString()
+    
+    def _load_onnx_session(self, onnx_model: Optional[bytes]) -> None:
+        """Serve predictions from ``onnx_model`` when onnxruntime is available (sklearn otherwise)"""
+        self._onnx_session = None
+        if ONNX_AVAILABLE and onnx_model:
+            self._onnx_session = ort.InferenceSession(onnx_model, providers=["CPUExecutionProvider"])
+    
+    def _rule_based_classification(self, features: np.ndarray) -> Tuple[str, float]:
+        """Rule-based classification as fallback"""
+        best, confidence = _rule_scores(np.asarray(features, dtype=np.float64))
+        return RULE_STYLES[best], min(float(confidence), 1.0)
     
     def train_classifier(self, training_data: List[Tuple[Dict[str, float], str]]):
         """Train the classifier with labeled data"""
@@ -197,25 +355,24 @@ class LearningStyleClassifier:
                 print("Insufficient training data for ML model. Using rule-based classification.")
                 return
             
-            X = []
-            y = []
-            
-            for features, style in training_data:
-                feature_vector = [features.get(name, 0.0) for name in self.feature_names]
-                X.append(feature_vector)
-                y.append(list(self.style_mapping.values()).index(style))
+            X = np.empty((len(training_data), len(self.feature_names)), dtype=np.float64)
+            y = np.empty(len(training_data), dtype=np.int64)
             
-            X = np.array(X)
-            y = np.array(y)
+            for row, (features, style) in enumerate(training_data):
+                X[row] = [features.get(name, 0.0) for name in self.feature_names]
+                y[row] = self._style_to_idx[style]
             
             # Split data
+            from sklearn.model_selection import train_test_split
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
             
-            # Scale features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            # Scale features in float64, then hand the forest single-precision rows
+            X_train_scaled = self.scaler.fit_transform(X_train).astype(FEATURE_DTYPE)
+            X_test_scaled = self.scaler.transform(X_test).astype(FEATURE_DTYPE)
             
-            # Train model
+            # Train model (any ONNX graph or cached scaler of the previous fit is stale now)
+            self._onnx_session = None
+            self._scaler_mean = self._scaler_inv_scale = None
             self.classifier.fit(X_train_scaled, y_train)
             
             # Evaluate
@@ -225,6 +382,7 @@ class LearningStyleClassifier:
             print(f"Learning Style Classifier trained - Train Accuracy: {train_score:.3f}, Test Accuracy: {test_score:.3f}")
             
             self.is_trained = True
+            cache_clear()
             
             # Save model
             self.save_model()
@@ -233,17 +391,20 @@ class LearningStyleClassifier:
             print(f"Error training classifier: {e}")
     
     def save_model(self, filepath: str = "ml/learning_style_model.pkl"):
-        """Save trained model to file"""
+        """Save trained model to file (with an ONNX export of scaler + forest when skl2onnx is installed)"""
         try:
+            onnx_model = self._export_onnx()
             model_data = {
                 'classifier': self.classifier,
                 'scaler': self.scaler,
                 'is_trained': self.is_trained,
                 'style_mapping': self.style_mapping,
-                'feature_names': self.feature_names
+                'feature_names': self.feature_names,
+                'onnx_model': onnx_model
             }
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
-            joblib.dump(model_data, filepath)
+            joblib.dump(model_data, filepath, compress=MODEL_COMPRESSION)
+            self._load_onnx_session(onnx_model)
             print(f"Learning Style Classifier saved to {filepath}")
         except Exception as e:
             print(f"Error saving model: {e}")
@@ -257,28 +418,57 @@ class LearningStyleClassifier:
                 self.scaler = model_data['scaler']
                 self.is_trained = model_data['is_trained']
                 self.style_mapping = model_data['style_mapping']
+                self._style_to_idx = {style: idx for idx, style in self.style_mapping.items()}
                 self.feature_names = model_data['feature_names']
+                self._load_onnx_session(model_data.get('onnx_model'))
+                self._scaler_mean = self._scaler_inv_scale = None
+                cache_clear()
                 print(f"Learning Style Classifier loaded from {filepath}")
             else:
                 print("Model file not found. Using rule-based classification.")
         except Exception as e:
             print(f"Error loading model: {e}")
 
-# Global classifier instance
-learning_style_classifier = LearningStyleClassifier()
+# Global classifier instance, built on first use so importing the module stays cheap
+@lru_cache(maxsize=1)
+def get_learning_style_classifier() -> LearningStyleClassifier:
+    """Shared LearningStyleClassifier used by the module-level functions"""
+    return LearningStyleClassifier()
+
+def __getattr__(name: str):
+    """Keep ``learning_style_classifier`` importable as a module attribute"""
+    if name == "learning_style_classifier":
+        return get_learning_style_classifier()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def classify_learner_style(learner_id: str) -> Dict[str, any]:
-    """Main function to classify a learner's style"""
+    """Main function to classify a learner's style
+    
+    Results are reused for up to STYLE_CACHE_TTL seconds, or until the learner's record or
+    engagements are written through utils.crud_operations.
+    """
+    cached = _style_cache.get(learner_id)
+    if cached is not None:
+        return cached
+    
+    result = _classify_learner_style(learner_id)
+    if "error" not in result:
+        _style_cache.put(learner_id, result)
+    return result
+
+def _classify_learner_style(learner_id: str) -> Dict[str, any]:
+    """Extract the learner's features once and classify them"""
+    classifier = get_learning_style_classifier()
     try:
-        style, confidence = learning_style_classifier.classify_learning_style(learner_id)
-        features = learning_style_classifier.extract_learning_features(learner_id)
+        features = classifier._extract_feature_vector(learner_id)
+        style, confidence = classifier._classify_features(features)
         
         return {
             "learner_id": learner_id,
             "learning_style": style,
             "confidence": round(confidence, 3),
-            "features": features,
-            "classification_method": "ml_model" if learning_style_classifier.is_trained else "rule_based",
+            "features": None if features is None else classifier._feature_dict(features),
+            "classification_method": "ml_model" if classifier.is_trained else "rule_based",
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -290,6 +480,27 @@ def classify_learner_style(learner_id: str) -> Dict[str, any]:
             "timestamp": datetime.now().isoformat()
         }
 
+def classify_learner_styles(learner_ids: List[str]) -> Dict[str, Dict]:
+    """Main function to classify many learners' styles with one model call"""
+    classifier = get_learning_style_classifier()
+    features_by_learner = {learner_id: classifier._extract_feature_vector(learner_id)
+                           for learner_id in dict.fromkeys(learner_ids)}
+    classifications = classifier._classify_feature_rows(list(features_by_learner.values()))
+    
+    classification_method = "ml_model" if classifier.is_trained else "rule_based"
+    timestamp = datetime.now().isoformat()
+    return {
+        learner_id: {
+            "learner_id": learner_id,
+            "learning_style": style,
+            "confidence": round(confidence, 3),
+            "features": None if features is None else classifier._feature_dict(features),
+            "classification_method": classification_method,
+            "timestamp": timestamp
+        }
+        for (learner_id, features), (style, confidence) in zip(features_by_learner.items(), classifications)
+    }
+
 if __name__ == "__main__":
     # Test the classifier
     classifier = LearningStyleClassifier()
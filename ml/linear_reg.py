@@ -19,6 +19,21 @@ def predict_completion_time(avg_score, time_spent, difficulty):
     
     return round(predicted_time, 2)
 
+def predict_completion_time_batch(avg_scores, time_spent, difficulty):
+    """
+    Vectorized predict_completion_time for a cohort of learners (array inputs, array of hours out)
+    Uses np.round, so an exact .xx5 tie may land 0.01 away from the scalar round()
+    """
+    avg_scores = np.asarray(avg_scores, dtype=np.float64)
+    time_spent = np.asarray(time_spent, dtype=np.float64)
+    difficulty = np.asarray(difficulty, dtype=np.float64)
+    
+    base_time = time_spent * 2
+    score_factor = np.fmax(0.5, 1.5 - (avg_scores / 100))
+    difficulty_factor = 1 + (difficulty - 1) * 0.5
+    
+    return np.round(base_time * score_factor * difficulty_factor, 2)
+
 # Legacy function for compatibility
 def train_linreg(X, y):
     """
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Happy-path test for the learning pace calculator and performance prediction model
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def test_pace_and_prediction_happy_path():
+    """A learner with recent activities gets pace metrics and a prediction, not an error"""
+    import ml.learning_pace_predictor as pace_module
+    
+    now = datetime.now()
+    learner = {
+        "id": "test-learner-pace",
+        "activities": [
+            {"activity_type": activity_type, "score": score, "duration": 45,
+             "timestamp": (now - timedelta(days=days_ago)).isoformat()}
+            for activity_type, score, days_ago in [
+                ("module_completed", 72, 12), ("quiz_completed", 65, 9),
+                ("assignment_submitted", 80, 6), ("module_completed", 88, 2)
+            ]
+        ]
+    }
+    
+    # Monkey patch the data sources so the test needs no database
+    original_read_learner = pace_module.read_learner
+    original_get_engagement_metrics = pace_module.get_engagement_metrics
+    pace_module.read_learner = lambda learner_id: learner if learner_id == learner["id"] else None
+    pace_module.get_engagement_metrics = lambda learner_id, content_id=None: []
+    pace_module.cache_clear()
+    
+    try:
+        pace = pace_module.LearningPaceCalculator().calculate_learning_pace(learner["id"])
+        assert "error" not in pace, pace
+        assert pace["pace_metrics"]["total_activities"] == 4
+        
+        prediction = pace_module.PerformancePredictionModel().predict_performance(learner["id"])
+        assert "error" not in prediction, prediction
+        assert prediction["features_used"], prediction
+        assert 0 <= prediction["predicted_metrics"]["predicted_avg_score"] <= 100
+    finally:
+        pace_module.read_learner = original_read_learner
+        pace_module.get_engagement_metrics = original_get_engagement_metrics
+        pace_module.cache_clear()
+
+def test_small_training_set_predictions_vary():
+    """A model trained on 20-40 rows must still split, not predict one constant for every learner"""
+    import random
+    import numpy as np
+    from ml.learning_pace_predictor import PerformancePredictionModel
+    
+    rng = random.Random(5)
+    for n_rows in (20, 30, 40):
+        model = PerformancePredictionModel()
+        model.save_model = lambda *args, **kwargs: None  # keep the repo's saved model untouched
+        training_data = []
+        for _ in range(n_rows):
+            features = {name: rng.uniform(0, 1) for name in model.feature_names}
+            features["historical_avg_score"] = rng.uniform(30, 95)
+            target = {"avg_score": features["historical_avg_score"] + rng.uniform(-5, 5)}
+            training_data.append((features, target))
+        
+        model.train_model(training_data)
+        assert model.is_trained, n_rows
+        
+        feature_matrix = np.array([[features[name] for name in model.feature_names]
+                                   for features, _ in training_data])
+        predictions = model.model.predict(model._model_input(feature_matrix))
+        assert predictions.std() > 1.0, (n_rows, predictions.std())
+
+def test_same_day_burst_trend_is_stable():
+    """Evenly spaced activities packed into a few hours are a stable pace, not a slowdown"""
+    import json
+    from ml.learning_pace_predictor import LearningPaceCalculator, _activity_arrays
+    
+    start = datetime(2024, 3, 4, 9, 0)
+    calculator = LearningPaceCalculator()
+    for n_activities in (4, 5, 6, 8):
+        for gap in (timedelta(minutes=10), timedelta(hours=2)):
+            activities = [{"activity_type": "quiz_completed", "timestamp": (start + gap * i).isoformat()}
+                          for i in range(n_activities)]
+            trend = calculator._analyze_pace_trend(_activity_arrays(activities))
+            assert trend["trend"] == "stable", (n_activities, gap, trend)
+            assert trend["velocity_change"] == 0.0, (n_activities, gap, trend)
+            json.dumps(trend)
+            assert all(type(trend[key]) is float
+                       for key in ("velocity_change", "first_half_velocity", "second_half_velocity")), trend
+
+def test_malformed_activity_records_do_not_raise():
+    """Bad stored values (None type, text score, dict duration) are treated as missing, not raised"""
+    import ml.learning_pace_predictor as pace_module
+    
+    now = datetime.now()
+    activities = [{"activity_type": "quiz_completed", "score": 70, "duration": 30,
+                   "timestamp": (now - timedelta(days=days_ago)).isoformat()} for days_ago in (1, 3, 5, 8)]
+    activities[0]["activity_type"] = None
+    activities[1]["score"] = "high"
+    activities[2]["duration"] = {"minutes": 30}
+    learner = {"id": "test-learner-malformed", "activities": activities}
+    
+    original_read_learner = pace_module.read_learner
+    original_get_engagement_metrics = pace_module.get_engagement_metrics
+    pace_module.read_learner = lambda learner_id: learner if learner_id == learner["id"] else None
+    pace_module.get_engagement_metrics = lambda learner_id, content_id=None: []
+    pace_module.cache_clear()
+    
+    try:
+        pace = pace_module.LearningPaceCalculator().calculate_learning_pace(learner["id"])
+        assert "error" not in pace, pace
+        assert pace["pace_metrics"]["total_activities"] == 4
+        
+        prediction = pace_module.PerformancePredictionModel().predict_performance(learner["id"])
+        assert "error" not in prediction, prediction
+    finally:
+        pace_module.read_learner = original_read_learner
+        pace_module.get_engagement_metrics = original_get_engagement_metrics
+        pace_module.cache_clear()
+
+if __name__ == "__main__":
+    test_pace_and_prediction_happy_path()
+    test_small_training_set_predictions_vary()
+    test_same_day_burst_trend_is_stable()
+    test_malformed_activity_records_do_not_raise()
+    print("[SUCCESS] Learning pace and performance prediction tests passed")
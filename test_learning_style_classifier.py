@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the learning style classifier's public results
+"""
+
+import sys
+import os
+import json
+
+# Add current directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+class _StubOnnxSession:
+    """Stands in for onnxruntime.InferenceSession: float32 labels and probabilities like the real graph"""
+    
+    def run(self, output_names, inputs):
+        import numpy as np
+        n_rows = len(inputs["X"])
+        probabilities = np.tile(np.array([0.1, 0.6, 0.2, 0.1], dtype=np.float32), (n_rows, 1))
+        return [probabilities.argmax(axis=1), probabilities]
+
+def test_onnx_results_are_json_serializable():
+    """Results served from the ONNX session serialize like the sklearn ones"""
+    import numpy as np
+    import ml.learning_style_classifier as style_module
+    
+    learner = {"id": "test-learner-style", "activities": [
+        {"activity_type": "video_lecture", "score": 80, "duration": 30},
+        {"activity_type": "project", "score": 70, "duration": 60}
+    ]}
+    classifier = style_module.get_learning_style_classifier()
+    
+    # Monkey patch the data sources and a trained ONNX-backed model so the test needs neither DB nor onnxruntime
+    original_read_learner = style_module.read_learner
+    original_get_engagement_metrics = style_module.get_engagement_metrics
+    original_state = (classifier.is_trained, classifier._onnx_session, getattr(classifier.classifier, "classes_", None))
+    style_module.read_learner = lambda learner_id: learner if learner_id == learner["id"] else None
+    style_module.get_engagement_metrics = lambda learner_id, content_id=None: []
+    classifier.is_trained = True
+    classifier._onnx_session = _StubOnnxSession()
+    classifier.classifier.classes_ = np.arange(4)
+    style_module.cache_clear()
+    
+    try:
+        result = style_module.classify_learner_style(learner["id"])
+        assert "error" not in result, result
+        assert result["learning_style"] == "Auditory", result
+        assert result["classification_method"] == "ml_model", result
+        json.dumps(result)
+        
+        results = style_module.classify_learner_styles([learner["id"], "missing-learner"])
+        assert results[learner["id"]]["confidence"] == 0.6, results
+        json.dumps(results)
+    finally:
+        style_module.read_learner = original_read_learner
+        style_module.get_engagement_metrics = original_get_engagement_metrics
+        classifier.is_trained, classifier._onnx_session, classes = original_state
+        if classes is None:
+            del classifier.classifier.classes_
+        else:
+            classifier.classifier.classes_ = classes
+        style_module.cache_clear()
+
+def test_cached_style_is_a_copy_and_dropped_on_learner_write():
+    """Cache hits can be mutated safely, and a write to the learner drops the cached style"""
+    import ml.learning_style_classifier as style_module
+    from utils.result_cache import invalidate_learner
+    
+    learner = {"id": "test-learner-style-cache", "activities": [
+        {"activity_type": "video_lecture", "score": 80, "duration": 30},
+        {"activity_type": "video_tutorial", "score": 75, "duration": 25}
+    ]}
+    
+    original_read_learner = style_module.read_learner
+    original_get_engagement_metrics = style_module.get_engagement_metrics
+    style_module.read_learner = lambda learner_id: learner if learner_id == learner["id"] else None
+    style_module.get_engagement_metrics = lambda learner_id, content_id=None: []
+    style_module.cache_clear()
+    
+    try:
+        first = style_module.classify_learner_style(learner["id"])
+        first["learning_style"] = "mutated"
+        first["features"].clear()
+        second = style_module.classify_learner_style(learner["id"])
+        assert second["learning_style"] != "mutated", second
+        assert second["features"], second
+        
+        # New activities are only seen after the write path invalidates the learner
+        learner["activities"] = [{"activity_type": "hands_on_project", "score": 90, "duration": 60}] * 3
+        assert style_module.classify_learner_style(learner["id"]) == second
+        invalidate_learner(learner["id"])
+        assert style_module.classify_learner_style(learner["id"])["features"] != second["features"]
+    finally:
+        style_module.read_learner = original_read_learner
+        style_module.get_engagement_metrics = original_get_engagement_metrics
+        style_module.cache_clear()
+
+if __name__ == "__main__":
+    test_onnx_results_are_json_serializable()
+    test_cached_style_is_a_copy_and_dropped_on_learner_write()
+    print("[SUCCESS] Learning style classifier tests passed")
@@ -5,6 +5,7 @@ from models.learner import Learner
 from models.content import Content
 from models.engagement import Engagement
 from models.progress import ProgressLog
+from utils.result_cache import invalidate_learner
 from datetime import datetime, timezone
 
 IN_MEMORY_DB = {"learners": {}, "contents": {}, "engagements": {}, "progress_logs": {}}
@@ -53,10 +54,10 @@ def create_learner(learner_obj):
     doc = learner_obj.to_dict()
     if coll is not None:
         coll.insert_one(doc)
-        return doc
     else:
         IN_MEMORY_DB["learners"][learner_obj.id] = doc
-        return doc
+    invalidate_learner(learner_obj.id)
+    return doc
 
 def create_content(content_obj):
     coll = _get_mongo_collection("contents")
@@ -73,10 +74,10 @@ def create_engagement(engagement_obj):
     doc = engagement_obj.to_dict()
     if coll is not None:
         coll.insert_one(doc)
-        return doc
     else:
         IN_MEMORY_DB["engagements"][engagement_obj.id] = doc
-        return doc
+    invalidate_learner(engagement_obj.learner_id)
+    return doc
 
 def create_progress_log(progress_log_obj):
     coll = _get_mongo_collection("progress_logs")
@@ -176,12 +177,14 @@ def update_learner(learner_id, update_fields: dict):
         )
         if res:
             res.pop("_id", None)
+            invalidate_learner(learner_id)
         return res
     else:
         doc = IN_MEMORY_DB["learners"].get(learner_id)
         if not doc:
             return None
         doc.update(update_fields)
+        invalidate_learner(learner_id)
         return doc
 
 def update_content(content_id, update_fields: dict):
@@ -208,6 +211,7 @@ def update_engagement(engagement_id, update_fields: dict):
         )
         if res:
             res.pop("_id", None)
+            invalidate_learner(res.get("learner_id"))
             # Return as Engagement object for consistency
             if "_id" not in res:
                 res["_id"] = engagement_id
@@ -219,6 +223,7 @@ def update_engagement(engagement_id, update_fields: dict):
         if not doc:
             return None
         doc.update(update_fields)
+        invalidate_learner(doc.get("learner_id"))
         # Return as Engagement object for consistency
         engagement = Engagement(**doc)
         return engagement.to_dict()
@@ -236,6 +241,7 @@ def log_activity(learner_id, activity_type, duration, score):
             {"_id": learner_id},
             {"$push": {"activities": activity}, "$inc": {"activity_count": 1}},
         )
+        invalidate_learner(learner_id)
         return read_learner(learner_id)
     else:
         doc = IN_MEMORY_DB["learners"].get(learner_id)
@@ -243,15 +249,17 @@ def log_activity(learner_id, activity_type, duration, score):
             return None
         doc.setdefault("activities", []).append(activity)
         doc["activity_count"] = doc.get("activity_count", 0) + 1
+        invalidate_learner(learner_id)
         return doc
 
 def delete_learner(learner_id):
     coll = _get_mongo_collection("learners")
     if coll is not None:
-        result = coll.delete_one({"_id": learner_id})
-        return result.deleted_count > 0
+        deleted = coll.delete_one({"_id": learner_id}).deleted_count > 0
     else:
-        return IN_MEMORY_DB["learners"].pop(learner_id, None) is not None
+        deleted = IN_MEMORY_DB["learners"].pop(learner_id, None) is not None
+    invalidate_learner(learner_id)
+    return deleted
 
 def delete_content(content_id):
     coll = _get_mongo_collection("contents")
@@ -264,10 +272,13 @@ def delete_content(content_id):
 def delete_engagement(engagement_id):
     coll = _get_mongo_collection("engagements")
     if coll is not None:
-        result = coll.delete_one({"_id": engagement_id})
-        return result.deleted_count > 0
+        doc = coll.find_one_and_delete({"_id": engagement_id}, {"learner_id": 1})
     else:
-        return IN_MEMORY_DB["engagements"].pop(engagement_id, None) is not None
+        doc = IN_MEMORY_DB["engagements"].pop(engagement_id, None)
+    if doc is None:
+        return False
+    invalidate_learner(doc.get("learner_id"))
+    return True
 
 def read_learner_activities(learner_id):
     """Read all activities for a specific learner"""
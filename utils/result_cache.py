@@ -0,0 +1,80 @@
+"""
+Bounded, thread-safe caches for per-learner results shared by the ML modules
+"""
+import copy
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# Every live ResultCache, so a write to one learner's data can drop that learner's entries everywhere
+_caches = weakref.WeakSet()
+_caches_lock = threading.Lock()
+
+
+class ResultCache:
+    """
+    LRU cache with an optional time-to-live
+
+    Values are deep-copied on the way in and out, so callers can mutate what they
+    store or get back without corrupting later hits. ``learner_of`` maps a key to
+    the learner it belongs to (the key itself by default) for invalidate_learner().
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None,
+                 learner_of: Optional[Callable[[Hashable], Any]] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._learner_of = learner_of
+        self._entries = OrderedDict()  # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+        with _caches_lock:
+            _caches.add(self)
+
+    def get(self, key: Hashable) -> Any:
+        """Copy of the value cached under ``key``, or None when absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a copy of ``value`` under ``key``, evicting the least recently used entry when full"""
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard_learner(self, learner_id: Any) -> None:
+        """Drop every entry belonging to ``learner_id``"""
+        learner_of = self._learner_of or (lambda key: key)
+        with self._lock:
+            for key in [key for key in self._entries if learner_of(key) == learner_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def invalidate_learner(learner_id: Any) -> None:
+    """Drop every cached result for ``learner_id`` (called after that learner's data is written)"""
+    if learner_id is None:
+        return
+    with _caches_lock:
+        caches = list(_caches)
+    for cache in caches:
+        cache.discard_learner(learner_id)